@@ -1,9 +1,12 @@
 import streamlit as st
-from utils.resume_parser import extract_text_from_resume, extract_skills_from_resume
+from utils.resume_parser import parse_resume_file
 from utils.visualizer import create_simple_skills_visualization
+from utils.skill_matcher import get_skill_matcher
+from utils.skill_normalizer import canonical_names
+from utils.supabase_data_utils import add_user_skills
 
 
-def render_sidebar(supabase, user_id):
+def render_sidebar(supabase, user):
     """
     Render the sidebar components in the provided container.
 
@@ -16,7 +19,7 @@ def render_sidebar(supabase, user_id):
         render_api_key_input()
 
         # Resume upload component
-        render_resume_upload(supabase,user_id)
+        render_resume_upload(supabase, user)
 
         # Add link to core competencies assessment
         if st.button("Assess Core Competencies (ASC)"):
@@ -58,24 +61,25 @@ def render_api_key_input():
                 else:
                     st.error("Invalid API key format. Keys should start with 'sk-'")
 
-def render_resume_upload(supabase, user_id):
+def render_resume_upload(supabase, user):
     """Render the resume upload component."""
     uploaded_file = st.file_uploader("Upload your resume", type=["pdf", "docx"])
 
     if uploaded_file:
         with st.spinner("Analyzing your resume..."):
-            # Extract text from resume
-            resume_text = extract_text_from_resume(uploaded_file)
+            # Extract text and skills, reusing the result of earlier reruns for the same file
+            resume_skills = parse_resume_file(uploaded_file)["skills"]
 
-            # Extract skills from resume text
-            resume_skills = extract_skills_from_resume(resume_text)
+            # Update skills list with canonical ASC names, so the same skill is listed
+            # and matched once however it was written
+            known = {skill.lower() for skill in st.session_state.skills}
+            st.session_state.skills = canonical_names(st.session_state.skills + resume_skills)
+            new_skills = [skill for skill in st.session_state.skills if skill.lower() not in known]
+            new_skills_count = len(new_skills)
 
-            # Update skills list
-            new_skills_count = 0
-            for skill in resume_skills:
-                if skill not in st.session_state.skills:
-                    st.session_state.skills.append(skill)
-                    new_skills_count += 1
+            # Save new skills to the profile the chat agents read
+            if new_skills:
+                add_user_skills(supabase, user, new_skills)
 
             # Confirm to user
             st.success(f"Found {len(resume_skills)} skills in your resume! ({new_skills_count} new)")
@@ -109,9 +113,23 @@ def render_skills_display():
         # Add a button to visualize skills
         if st.button("Visualize My Skills"):
             st.session_state.show_skills_map = not st.session_state.show_skills_map
+
+        # Add a button to match skills against ASC occupations
+        if st.button("Match My Skills to Careers"):
+            try:
+                st.session_state.career_matches = get_skill_matcher().match(st.session_state.skills, top_k=5)
+            except Exception as e:
+                st.error(f"Error matching skills: {str(e)}")
     else:
         st.info("No skills identified yet. Upload your resume or mention your skills in the chat.")
 
+    # Career matches (filled by the match button)
+    if st.session_state.get("career_matches"):
+        st.subheader("Career Matches")
+        for match in st.session_state.career_matches:
+            st.markdown(f"**{match['title']}** (ANZSCO: {match['anzsco_code']})")
+            st.caption(f"Matched on: {', '.join(match['contributions'])}")
+
     # Skills visualization (toggled by button)
     if st.session_state.show_skills_map and st.session_state.skills:
         st.subheader("Skills Map")
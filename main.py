@@ -8,6 +8,7 @@ from app.sidebar_components import render_sidebar
 from app.competencies_component import render_competencies_assessment
 from supabase import create_client
 import os
+import uuid
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -42,6 +43,8 @@ def initialize_session_state():
         st.session_state.show_skills_map = False
     if "openai_api_key" not in st.session_state:
         st.session_state.openai_api_key = ""
+    if "chat_session_id" not in st.session_state:
+        st.session_state.chat_session_id = uuid.uuid4().hex
 
 
 def main():
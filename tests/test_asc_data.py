@@ -0,0 +1,34 @@
+import pytest
+
+from utils import asc_data
+from utils.asc_data import KBSingleton
+
+
+def test_singleton_reloads_when_the_knowledge_base_changes(monkeypatch):
+    version = "1"
+    monkeypatch.setattr(asc_data, "get_kb_version", lambda: version)
+    loads = []
+    singleton = KBSingleton(lambda kb_version: loads.append(kb_version) or object())
+
+    first = singleton.get()
+    assert singleton.get() is first
+
+    version = "2"
+    assert singleton.get() is not first
+    assert loads == ["1", "2"]
+
+
+def test_failed_load_is_retried(monkeypatch):
+    monkeypatch.setattr(asc_data, "get_kb_version", lambda: "1")
+    attempts = []
+
+    def load(kb_version):
+        attempts.append(kb_version)
+        if len(attempts) == 1:
+            raise FileNotFoundError("asc_knowledge_base.json")
+        return "loaded"
+
+    singleton = KBSingleton(load)
+    with pytest.raises(FileNotFoundError):
+        singleton.get()
+    assert singleton.get() == "loaded"
@@ -0,0 +1,86 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import httpx
+import openai
+from tenacity import wait_none
+
+from utils.agents import call_scheduler
+from utils.agents.call_scheduler import CallScheduler
+
+# 10,000 tokens a second, so a 1,000 token estimate refills in 0.1s
+TOKENS_PER_MINUTE = 600000
+
+
+def _rate_limit_error():
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    return openai.RateLimitError("Rate limit reached", response=httpx.Response(429, request=request),
+                                 body={"code": "rate_limit_exceeded"})
+
+
+def _run(coro):
+    return asyncio.run(asyncio.wait_for(coro, 5))
+
+
+def test_call_waits_for_refill_when_bucket_is_empty():
+    async def scenario():
+        scheduler = CallScheduler(tokens_per_minute=TOKENS_PER_MINUTE)
+        scheduler._tokens = 0.0
+
+        async def make_call():
+            return "ok"
+
+        start = time.perf_counter()
+        result = await scheduler.call(make_call, 1000)
+        return result, time.perf_counter() - start, scheduler.stats()
+
+    result, elapsed, stats = _run(scenario())
+    assert result == "ok"
+    assert 0.05 < elapsed < 1
+    assert stats["queued"] == 1 and stats["queue_depth"] == 0
+
+
+def test_call_recovers_after_rate_limit(monkeypatch):
+    monkeypatch.setattr(call_scheduler, "wait_random_exponential", lambda **kwargs: wait_none())
+
+    async def scenario():
+        scheduler = CallScheduler(tokens_per_minute=TOKENS_PER_MINUTE)
+        attempts = []
+
+        async def make_call():
+            attempts.append(time.perf_counter())
+            if len(attempts) == 1:
+                raise _rate_limit_error()
+            return "ok"
+
+        result = await scheduler.call(make_call, 1000)
+        return result, attempts, scheduler.stats()
+
+    result, attempts, stats = _run(scenario())
+    assert result == "ok"
+    assert len(attempts) == 2
+    # The 429 emptied the bucket, so the retry waited for it to refill rather than forever
+    assert 0.05 < attempts[1] - attempts[0] < 1
+    assert stats["retries"] == 1 and stats["in_flight"] == 0
+
+
+def test_call_waits_out_usage_beyond_the_estimate():
+    async def scenario():
+        scheduler = CallScheduler(tokens_per_minute=TOKENS_PER_MINUTE)
+
+        async def expensive_call():
+            return SimpleNamespace(usage=SimpleNamespace(total_tokens=TOKENS_PER_MINUTE + 2000))
+
+        async def make_call():
+            return "ok"
+
+        await scheduler.call(expensive_call, 1000)
+        assert scheduler._tokens < 0
+        start = time.perf_counter()
+        result = await scheduler.call(make_call, 1000)
+        return result, time.perf_counter() - start
+
+    result, elapsed = _run(scenario())
+    assert result == "ok"
+    assert 0.2 < elapsed < 1
@@ -0,0 +1,37 @@
+import json
+
+import numpy as np
+
+from utils.competency_matcher import CompetencyMatcher
+
+
+def _build(tmp_path, entries):
+    json_path = tmp_path / "asc_knowledge_base.json"
+    json_path.write_text(json.dumps(entries))
+    return CompetencyMatcher.build(str(json_path))
+
+
+def _entry(code, competencies):
+    return {"metadata": {"anzsco_code": code, "title": f"Occupation {code}", "core_competencies": competencies}}
+
+
+def test_unknown_competency_is_skipped(tmp_path):
+    matcher = _build(tmp_path, [_entry("111111", [
+        {"name": "Teamwork", "score": 6},
+        {"name": "Underwater Basket Weaving", "score": 9},
+    ])])
+
+    row = matcher.matrix[0]
+    assert row[matcher.competencies.index("Teamwork")] == np.float32(0.6)
+    assert np.isnan(np.delete(row, matcher.competencies.index("Teamwork"))).all()
+
+
+def test_scores_are_scaled_by_the_asc_range(tmp_path):
+    matcher = _build(tmp_path, [
+        _entry("111111", [{"name": "Numeracy", "score": 4}]),
+        _entry("222222", [{"name": "Numeracy", "score": 5}]),
+    ])
+
+    column = matcher.competencies.index("Numeracy")
+    assert matcher.matrix[:, column].tolist() == [np.float32(0.4), np.float32(0.5)]
+    assert matcher.nearest({"Numeracy": 5}, top_k=1)[0]["anzsco_code"] == "222222"
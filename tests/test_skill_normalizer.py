@@ -0,0 +1,50 @@
+import json
+
+from utils.skill_normalizer import SkillNormalizer
+
+SKILLS = ["Python", "JavaScript", "Oracle Java", "Structured query language SQL", "Microsoft SQL Server",
+          "Data analysis", "Customer service", "Sales", "Welding"]
+TOOLS = ["Microsoft Excel", "Microsoft Word", "Microsoft Azure", "Google Analytics", "Node.js",
+         "Amazon Web Services AWS"]
+
+
+def _build(tmp_path):
+    json_path = tmp_path / "asc_knowledge_base.json"
+    json_path.write_text(json.dumps([{"metadata": {
+        "skills": [{"name": name} for name in SKILLS],
+        "technology_tools": TOOLS,
+    }}]))
+    return SkillNormalizer.build(str(json_path))
+
+
+def test_variants_map_to_the_canonical_name(tmp_path):
+    normalizer = _build(tmp_path)
+
+    assert normalizer.canonical_map(["py", "js", "Python programming", "excel", "ms word", "SQL", "aws"]) == {
+        "py": "Python",
+        "js": "JavaScript",
+        "Python programming": "Python",
+        "excel": "Microsoft Excel",
+        "ms word": "Microsoft Word",
+        "SQL": "Structured query language SQL",
+        "aws": "Amazon Web Services AWS",
+    }
+
+
+def test_extra_words_lower_the_score(tmp_path):
+    normalizer = _build(tmp_path)
+
+    exact, extended = normalizer.normalize(["Python", "Python scripting"])
+    assert exact["score"] > 0.99
+    assert extended["name"] == "Python" and extended["score"] < 0.9
+
+
+def test_different_skills_are_not_merged(tmp_path):
+    normalizer = _build(tmp_path)
+
+    assert normalizer.canonical_map(["TypeScript", "Google Ads", "Azure DevOps", "Sales forecasting"]) == {
+        "TypeScript": None,
+        "Google Ads": None,
+        "Azure DevOps": None,
+        "Sales forecasting": None,
+    }
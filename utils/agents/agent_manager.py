@@ -1,61 +1,147 @@
 # utils/agents/agent_manager.py
-import re
 
-from openai import OpenAI
-from agents import Agent, Runner, function_tool, FileSearchTool, WebSearchTool, RunContextWrapper,enable_verbose_stdout_logging
+from agents import Agent, Runner, RunConfig, function_tool, FileSearchTool, WebSearchTool, RunContextWrapper,enable_verbose_stdout_logging
+from agents.models.openai_provider import OpenAIProvider
+from openai.types.responses import ResponseTextDeltaEvent
 
 import streamlit as st
-import json
-import os
 import asyncio
-import concurrent.futures
-from utils.supabase_data_utils import get_user_skills, get_user_competencies
+import os
+import queue
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+from utils.supabase_data_utils import aget_cached_user_profile_data
+from utils.profile_cache import get_profile_cache
+from utils.agents.async_worker import get_async_worker
+from utils.agents.call_scheduler import ThrottledModelProvider, current_session, get_call_scheduler
+from utils.agents.client_pool import get_async_openai_client, get_openai_client
+from utils.agents.intent_router import COMBINED, ROUTER_ENABLED, get_intent_router
+from utils.agents.job_search import create_job_search_backend, get_job_search_cache
+from utils.agents.response_cache import ResponseCache
+from utils.asc_data import ASC_KB_JSON_PATH
+from utils.asc_index import ASC_RETRIEVAL_MODE, format_search_results, get_asc_index
+from utils.competency_matcher import format_competency_matches, get_competency_matcher
+from utils.skill_matcher import format_skill_matches, get_skill_matcher
+from utils.skill_normalizer import get_skill_normalizer
+from utils.kb_convert import convert_knowledge_base
+from utils.kb_shards import KB_LAYOUT, KB_SHARD_DIR, pack_shards
+from utils.kb_sync import KB_TEXT_DIR, sync_knowledge_base
 
 enable_verbose_stdout_logging()
 
+# Seconds an agent turn may run before it is cancelled
+AGENT_TURN_TIMEOUT = float(os.environ.get("AGENT_TURN_TIMEOUT", 90))
+TURN_TIMEOUT_NOTE = "This answer took too long and was cut short. Please try again or ask a narrower question."
+
+COMBINED_CAREERS_HEADER = "### Careers that match your profile\n\n"
+COMBINED_JOBS_HEADER = "\n\n### Current job opportunities\n\n"
+COMBINED_JOBS_FAILED = "Job listings could not be fetched right now. Please ask again to search for current openings."
+
+
+@dataclass
+class UserContext:
+    """Per-session run context handed to the shared agents."""
+    supabase: Any
+    user: Any
+    # Skills and competencies preloaded before the run, see _preload_profile
+    profile: Optional[dict] = None
+    # Chat session id; a new message from the session cancels its previous run
+    session_id: Optional[str] = None
+
+
+def format_user_profile(profile):
+    """Format a {"skills", "competencies"} profile for an agent."""
+    skills = profile.get("skills") or []
+    competencies = profile.get("competencies") or {}
+
+    profile_text = "User Profile Data:\n"
+    profile_text += f"- Skills: {', '.join(skills) if skills else 'No skills found.'}\n"
+    profile_text += "- Core Competencies:\n"
+    if competencies:
+        for comp, rating in competencies.items():
+            profile_text += f"  - {comp}: {rating}/10\n"
+    else:
+        profile_text += "  No competency ratings found.\n"
+    return profile_text
+
 
 class AgentManager:
-    def __init__(self, api_key=None, supabase = None, user =None):
-        """Initialize the agent manager"""
-        self.api_key = api_key
+    def __init__(self, api_key=None):
+        """Initialize the agent manager.
 
-        if api_key:
-            os.environ["OPENAI_API_KEY"] = api_key
+        One manager is shared by every session using the same API key (see
+        utils/agents/registry.py), so it must not hold any per-user state.
+        Per-user data travels in the UserContext passed to process_user_query.
+        """
+        self.api_key = api_key
         self.client = None
         self.triage_agent = None
         self.agents = {}
-        self.supabase_client =  supabase
-        self.user = user
-
+        self.vector_store = None
+        self.response_cache = ResponseCache()
+        self.job_search_backend = create_job_search_backend(api_key)
+        # The provider uses the pooled AsyncOpenAI client for this key, and all runs
+        # share the worker loop, so connections stay warm between turns. Model calls
+        # are admitted by the API key's process-wide scheduler. Tracing is off: the
+        # SDK exports traces with a process-wide key, which sessions must not share.
+        self.call_scheduler = get_call_scheduler(api_key)
+        provider = OpenAIProvider(openai_client=get_async_openai_client(api_key)) if api_key else OpenAIProvider()
+        self.run_config = RunConfig(
+            model_provider=ThrottledModelProvider(provider, self.call_scheduler),
+            tracing_disabled=True
+        )
 
 
 
-    def get_user_profile(self, context: RunContextWrapper) -> str:
-        """Get user skills and competencies from the  database."""
-        profile_text = "User Profile Data:\n"
-        skills = []
-        competencies = {}
 
-        if not self.supabase_client or not self.user:
+    async def get_user_profile(self, context: RunContextWrapper[UserContext]) -> str:
+        """Refresh the user's skills and competencies from the database."""
+        user_context = context.context
+        if not user_context or not user_context.supabase or not user_context.user:
             return "Error: Unable to access user database context."
 
         try:
-            skills = get_user_skills(self.supabase_client, self.user)
-            competencies = get_user_competencies(self.supabase_client, self.user)
-
-            profile_text += f"- Skills: {', '.join(skills) if skills else 'No skills found.'}\n"
-            profile_text += "- Core Competencies:\n"
-            if competencies:
-                for comp, rating in competencies.items():
-                    profile_text += f"  - {comp}: {rating}/5\n"
-            else:
-                profile_text += "  No competency ratings found.\n"
-
+            # The profile is already in the instructions, so a tool call means the
+            # model wants fresh data
+            get_profile_cache().invalidate(user_context.user.id)
+            user_context.profile = await aget_cached_user_profile_data(user_context.supabase, user_context.user)
+            return format_user_profile(user_context.profile)
         except Exception as e:
             print(f"Error fetching profile data from Supabase: {e}")
-            profile_text += "Error fetching profile data."
+            return "User Profile Data:\nError fetching profile data."
 
-        return profile_text
+    @staticmethod
+    async def _get_profile(user_context):
+        """Return the preloaded profile, fetching it if the run started without one."""
+        if user_context.profile is None:
+            user_context.profile = await aget_cached_user_profile_data(user_context.supabase, user_context.user)
+        return user_context.profile
+
+    @staticmethod
+    async def _preload_profile(context):
+        """Attach the user's profile to the run context so agents start with it."""
+        if not context or not context.supabase or not context.user or context.profile is not None:
+            return
+        try:
+            context.profile = await aget_cached_user_profile_data(context.supabase, context.user)
+        except Exception as e:
+            print(f"Error preloading profile data: {e}")
+
+    @staticmethod
+    def _with_profile(instructions):
+        """Dynamic instructions: the static prompt followed by the preloaded user profile."""
+        def build_instructions(context: RunContextWrapper[UserContext], agent):
+            profile = context.context.profile if context.context else None
+            if profile is None:
+                return instructions
+            return (
+                f"{instructions}\n"
+                f"{format_user_profile(profile)}\n"
+                "This profile is current. Only call get_user_profile if the user says they have just "
+                "changed their skills or competencies."
+            )
+        return build_instructions
 
     def _ensure_client(self):
         """Ensure the OpenAI client is initialized with the API key"""
@@ -65,9 +151,7 @@ class AgentManager:
 
         if not self.client:
             try:
-
-                os.environ["OPENAI_API_KEY"] = self.api_key
-                self.client = OpenAI(api_key=self.api_key)
+                self.client = get_openai_client(self.api_key)
                 print(f"OpenAI client initialized successfully with API key starting with: {self.api_key[:5]}...")
             except Exception as e:
                 st.error(f"Failed to initialize OpenAI client: {str(e)}")
@@ -77,13 +161,17 @@ class AgentManager:
 
     def initialize_agents(self):
         """Initialize all agents in the system"""
-        if not self._ensure_client():
-            return None
-        self.set_asc_vector_store()
-
         if self.triage_agent:
             return self.triage_agent
 
+        if not self._ensure_client():
+            return None
+        if ASC_RETRIEVAL_MODE != "local":
+            self.set_asc_vector_store()
+            if not self.vector_store:
+                return None
+        self._warm_up_indexes()
+
         try:
             self.agents["asc_retrieval"] = self._create_asc_retrieval_agent()
             self.agents["job_search"] = self._create_job_search_agent()
@@ -101,6 +189,85 @@ class AgentManager:
             st.error(error_msg)
             return None
 
+    @staticmethod
+    def _warm_up_indexes():
+        """Load the local indexes now, so the first tool call does not build them."""
+        if ASC_RETRIEVAL_MODE in ("local", "hybrid"):
+            try:
+                get_asc_index()
+            except Exception as e:
+                print(f"Local ASC index not available: {e}")
+        try:
+            get_skill_matcher()
+            get_competency_matcher()
+            get_skill_normalizer()
+        except Exception as e:
+            print(f"Skill and competency matchers not available: {e}")
+
+    async def search_asc_occupations(self, query: str, top_k: int = 5) -> str:
+        """Search the local ASC knowledge base for occupations matching a query.
+
+        Args:
+            query: Skills, tasks, tools or occupation names to search for.
+            top_k: Number of occupations to return.
+        """
+        try:
+            # Off the worker loop: a rebuilt index or a large search must not stall other sessions
+            results = await asyncio.to_thread(lambda: get_asc_index().search(query, top_k))
+            return format_search_results(results)
+        except Exception as e:
+            print(f"Error searching local ASC index: {e}")
+            return "Error searching the ASC knowledge base."
+
+    async def match_user_skills(self, context: RunContextWrapper[UserContext], top_k: int = 10) -> str:
+        """Rank ASC occupations by how well they match the user's saved skills.
+
+        Args:
+            top_k: Number of occupations to return.
+        """
+        user_context = context.context
+        if not user_context or not user_context.supabase or not user_context.user:
+            return "Error: Unable to access user database context."
+
+        try:
+            skills = (await self._get_profile(user_context))["skills"]
+            if not skills:
+                return "The user has no saved skills to match."
+            matches = await asyncio.to_thread(lambda: get_skill_matcher().match(skills, top_k))
+            return format_skill_matches(matches)
+        except Exception as e:
+            print(f"Error matching user skills: {e}")
+            return "Error matching the user's skills against ASC occupations."
+
+    async def find_competency_matches(self, context: RunContextWrapper[UserContext], top_k: int = 10) -> str:
+        """Find the ASC occupations whose core competency profile is closest to the user's ratings.
+
+        Args:
+            top_k: Number of occupations to return.
+        """
+        user_context = context.context
+        if not user_context or not user_context.supabase or not user_context.user:
+            return "Error: Unable to access user database context."
+
+        try:
+            competencies = (await self._get_profile(user_context))["competencies"]
+            if not any(competencies.values()):
+                return "The user has not rated any core competencies."
+            matches = await asyncio.to_thread(lambda: get_competency_matcher().nearest(competencies, top_k))
+            return format_competency_matches(matches)
+        except Exception as e:
+            print(f"Error matching user competencies: {e}")
+            return "Error matching the user's competencies against ASC occupations."
+
+    def _asc_retrieval_tools(self):
+        """Retrieval tools for the ASC agent, per ASC_RETRIEVAL_MODE (remote, local or hybrid)."""
+        tools = []
+        if ASC_RETRIEVAL_MODE in ("local", "hybrid"):
+            tools.append(function_tool(self.search_asc_occupations))
+        if ASC_RETRIEVAL_MODE != "local":
+            tools.append(FileSearchTool(vector_store_ids=[self.vector_store.id]))
+        return tools
+
     def _create_asc_retrieval_agent(self):
         """Create agent for ASC knowledge retrieval"""
 
@@ -108,7 +275,7 @@ class AgentManager:
         return Agent(
             name="ASC Career Recommendations",
             model="gpt-4o",
-            instructions="""
+            instructions=self._with_profile("""
             You are a specialized agent with expertise in the Australian Skills Classification (ASC) system.
 
             Your purpose is to provide accurate career recommendations based on users' skills and competencies.
@@ -120,24 +287,40 @@ class AgentManager:
             - Provide specific information from the ASC knowledge base
             - Suggest skills to develop for career advancement
 
+            Use match_user_skills to get occupations ranked by how well they match the user's skills.
+            Use find_competency_matches to get occupations closest to the user's core competency ratings.
             Use the retrieval tool to access detailed information about occupations, required skills, 
             competency levels, and specialized tasks from the ASC database.
 
             Be precise, informative, and helpful in your recommendations.
-            """,
+            """),
             tools=[
                 function_tool(self.get_user_profile),
-                FileSearchTool(vector_store_ids=[st.session_state.vector_store.id])
-            ]
+                function_tool(self.match_user_skills),
+                function_tool(self.find_competency_matches)
+            ] + self._asc_retrieval_tools()
 
         )
 
 
+    async def search_jobs(self, role: str, location: str = "Australia") -> str:
+        """Find current job listings for a role in an Australian location.
+
+        Args:
+            role: Job title or role to search for, e.g. "data analyst".
+            location: City, state or "Australia".
+        """
+        try:
+            return await get_job_search_cache().search(self.job_search_backend, role, location)
+        except Exception as e:
+            print(f"Error searching jobs: {e}")
+            return "Error searching for job listings."
+
     def _create_job_search_agent(self):
         return Agent(
             name="Job Search Assistant",
             model="gpt-4o",
-            instructions="""
+            instructions=self._with_profile("""
             You are a specialized agent for finding current job opportunities based on user's skills.
 
             Your purpose is to search for and provide information about actual job openings that match 
@@ -151,13 +334,15 @@ class AgentManager:
             - Share information on interview preparation for specific companies if the user asks
             - Be honest about the current job market conditions
             
-            Use get_user_profile to get user skill details
-            Use web search to find current job opportunities and market information from sites like linkedIn, Seek, Indeed etc.
+            The user's skill details are included below when available.
+            Use search_jobs to find current job listings for a role and location (from sites like linkedIn, Seek, Indeed etc.).
+            Use web search for other market information, such as company or interview research.
              
             Be practical, specific, and helpful in your recommendations.
-            """,
+            """),
             tools=[
                 function_tool(self.get_user_profile),
+                function_tool(self.search_jobs),
                 WebSearchTool()
             ]
 
@@ -169,7 +354,7 @@ class AgentManager:
         return Agent(
             name="Career Guide for ASC",
             model="gpt-4o",
-            instructions="""
+            instructions=self._with_profile("""
             You are a career guidance assistant that helps users explore career paths in Australian Skill Classification System based on their skills and interests.
 
             You have access to these specialized agents:
@@ -189,11 +374,11 @@ class AgentManager:
 
             For general questions, answer directly without using specialized agents.
 
-            IMPORTANT: Before making recommendations, always check if you have access to the user's skills and competencies using the get user profile tool function.
-            If not, ask the user about their skills or suggest uploading a resume before providing specific recommendations.
+            IMPORTANT: Before making recommendations, check the user's skills and competencies in the profile included below.
+            If there are none, ask the user about their skills or suggest uploading a resume before providing specific recommendations.
 
             Maintain a conversational and helpful tone throughout the interaction.
-            """,
+            """),
             handoffs=specialized_agents,
             tools=[function_tool(self.get_user_profile)]
 
@@ -206,184 +391,261 @@ class AgentManager:
         if not self._ensure_client():
             return None
 
-        vector_store = st.session_state.get("vector_store", None)
-
         try:
-            if not vector_store:
-                print("Checking vector stores... ")
-                vector_stores = self.client.vector_stores.list()
-
-                if vector_stores and vector_stores.data:
-                    print("Vector Stores Present... ")
-                    for vs in vector_stores.data:
-                        if vs.name == 'ASC Occupation Knowledge Base':
-                            print("ASC Occupation Knowledge Base Vector Found.")
-                            vector_store = vs
-                            st.session_state["vector_store"] = vector_store
-                            break
-
-                if not vector_store:
-                    print("No existing ASC Occupation Knowledge Base vector store found. Creating new one...")
-                    vector_store = self.client.vector_stores.create(name="ASC Knowledge Base")
-                    st.session_state["vector_store"] = vector_store
-                    print(f"Created vector store with ID: {vector_store.id}")
-
-            # Ensure local reference
-            vector_store = st.session_state["vector_store"]
-
-            # Check if files already exist in the vector store
-            existing_files = self.client.vector_stores.files.list(vector_store_id=vector_store.id)
-            print("Existing Files in Vector Store  - ", existing_files)
-
-            # Flag file to track if upload has already been done
-            flag_file = 'upload_done.flag'
-
-            # If the flag file exists, we skip the upload process
-            if os.path.exists(flag_file):
-                print("Upload has already been done before. Skipping upload.")
-                return
-
-            # If not, proceed with the upload
-            if not existing_files or len(existing_files.data) <= 2:
-                print("No files found or less than 3 files found in vector store. Uploading...")
-
-                kb_text_path = 'data/files'
-                os.makedirs(kb_text_path, exist_ok=True)
-
-                # Convert JSON to text files if not already done
-                if not os.path.exists(kb_text_path) or not any(
-                        os.path.isfile(os.path.join(kb_text_path, f)) for f in os.listdir(kb_text_path)):
-                    print("Converting JSON to text files...")
-                    self._convert_json_to_text_kb("data/asc_knowledge_base.json")
-
-                files_to_upload = []
-                file_count = 0
-                for filename in os.listdir(kb_text_path):
-                    file_path = os.path.join(kb_text_path, filename)
-                    if os.path.exists(file_path):
-                        with open(file_path, "rb") as file:
-                            # Upload the file to the vector store
-                            print(f"Uploading file: {filename} to Vector Store: {vector_store.name}")
-                            file_batch = self.client.vector_stores.file_batches.upload_and_poll(
-                                vector_store_id=vector_store.id,
-                                files=[file]
-                            )
-                            file_count += 1
-                            print(f"File upload completed: {filename}")
-                            print(f"Total files uploaded: {file_count}")
-                            print(file_batch.status)
-                            print(file_batch.file_counts)
-
-                print(f"Upload complete. Total files uploaded: {file_count}")
-
-                # After upload is complete, create a flag file to track it for future sessions
-                with open(flag_file, 'w') as f:
-                    f.write("Upload completed.")
-
+            # Refresh the text files; entries whose text has not changed are skipped
+            if KB_LAYOUT == "packed":
+                kb_dir = KB_SHARD_DIR
+                if os.path.exists(ASC_KB_JSON_PATH):
+                    counts = pack_shards(ASC_KB_JSON_PATH, KB_SHARD_DIR)
+                    print(f"Knowledge base packed into {counts['shards']} shards ({counts['written']} written)")
             else:
-                print(f"Vector store already has more than {len(existing_files.data)} file(s). Skipping upload.")
+                kb_dir = KB_TEXT_DIR
+                if os.path.exists(ASC_KB_JSON_PATH):
+                    self._convert_json_to_text_kb(ASC_KB_JSON_PATH)
+
+            self.vector_store = sync_knowledge_base(self.client, text_dir=kb_dir)
+            return self.vector_store
 
         except Exception as e:
             print(f"Error creating/checking for vector store: {e}")
             st.error(f"Failed to create/check vector store: {str(e)}")
             return None
 
-
-
-
-
-
     @staticmethod
     def _convert_json_to_text_kb(json_path):
         """Convert JSON knowledge base to text format for each occupation and save it in data folder"""
         try:
-            with open(json_path, 'r') as f:
-                data = json.load(f)
-                kb_entries = data if isinstance(data, list) else [data]
+            # Converted in this process: forking a pool from a Streamlit thread holding locks is unsafe
+            counts = convert_knowledge_base(json_path, KB_TEXT_DIR, workers=1)
+            print(f"Knowledge base converted: {counts['written']} written, {counts['unchanged']} unchanged, "
+                  f"{counts['removed']} removed")
         except Exception as e:
-            print(f"Error loading JSON file: {e}")
-            return
-
-        os.makedirs("data/files", exist_ok=True)
-        for entry in kb_entries:
-            metadata = entry.get("metadata", {})
-            anzsco_code = metadata.get("anzsco_code", "Unknown")
-            title = metadata.get("title", "Unknown Title")
-            description = metadata.get("description", "")
-
-            competencies = metadata.get("core_competencies", [])
-            comp_text = [
-                f"{comp.get('name', '')}: {comp.get('level', '')} (score: {comp.get('score', '')})"
-                for comp in competencies if comp.get("name", "")
-            ]
-
-            tasks = metadata.get("specialist_tasks", [])
-            tools = metadata.get("technology_tools", [])
+            print(f"Error converting JSON knowledge base: {e}")
 
-            text_entry = f"""
-# {title} (ANZSCO: {anzsco_code})
 
-## Description
-{description}
-
-## Required Core Competencies
-{', '.join(comp_text)}
-
-## Specialized Tasks
-{', '.join(tasks)}
-
-## Technology Tools
-{', '.join(tools)}
-"""
-
-            safe_title = re.sub(r'[\\/:"*?<>|]+', '_', title)
-            output_path = f"data/files/{safe_title}_{anzsco_code}.txt"
-            if os.path.exists(output_path):
-                print(f"Skipping file creation, file already exists: {output_path}")
-                continue
-            with open(output_path, 'w') as f:
-                f.write(text_entry)
-
-
-    def process_user_query(self, user_query):
+    def process_user_query(self, user_query, context=None):
         """
         Process user query through the agent system and return the response.
 
         Args:
             user_query: User's input text
+            context: UserContext for the session making the request
 
         Returns:
             str: Generated response
         """
-        os.environ["OPENAI_API_KEY"] = self.api_key
+        response = ""
+        for event in self.stream_user_query(user_query, context):
+            if event["type"] == "text":
+                response += event["content"]
+            elif event["type"] == "error":
+                response = event["content"]
+        return response
+
+    def stream_user_query(self, user_query, context=None):
+        """
+        Process user query through the agent system, yielding events as they arrive.
+
+        A turn is cancelled after AGENT_TURN_TIMEOUT seconds, keeping whatever text was
+        already streamed. A new message from the same session (context.session_id)
+        cancels that session's previous turn, as does closing this generator.
 
+        Args:
+            user_query: User's input text
+            context: UserContext for the session making the request
+
+        Yields:
+            dict: Event with a "type" of "text" (content is a token delta), "handoff"
+                  (agent is the agent now answering), "tool" (name of the tool called)
+                  or "error" (content is a user-facing message)
+        """
         if not self.triage_agent:
             if not self.initialize_agents():
-                return "I couldn't initialize the career guidance system. Please check your API key in the sidebar."
+                yield {"type": "error", "content": "I couldn't initialize the career guidance system. Please check your API key in the sidebar."}
+                return
 
-        if not self._ensure_client():
-            return "Error: Unable to process your request. Please make sure you've entered a valid OpenAI API key in the sidebar."
+        events = queue.Queue()
+        streamed_text = []
+
+        def emit(event):
+            if event["type"] == "text":
+                streamed_text.append(event["content"])
+            events.put(event)
+
+        async def run_turn():
+            start = time.perf_counter()
+            current_session.set(context.session_id if context else None)
+            await self._preload_profile(context)
+            profile = context.profile if context else None
 
-        def run_async_in_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            cached = self.response_cache.get(user_query, profile)
+            if cached is not None:
+                print(f"Response cache hit in {time.perf_counter() - start:.3f}s: {self.response_cache.stats()}")
+                emit({"type": "text", "content": cached})
+                return
+
+            route = self._route(user_query)
+            if route == COMBINED:
+                output = await self._run_combined(user_query, context, emit)
+                if output is not None:
+                    self.response_cache.put(user_query, profile, output, "job_search")
+                return
+
+            result = await self._stream_run(self.agents.get(route, self.triage_agent), user_query, context, emit)
+            self._log_turn(start, result)
+            self.response_cache.put(user_query, profile, result.final_output, self._agent_key(result.last_agent))
+
+        async def run_query_streamed():
             try:
-                result = loop.run_until_complete(
-                    Runner.run(
-                        starting_agent=self.triage_agent,
-                        input=user_query
-                    )
-                )
-                return result.final_output
+                await asyncio.wait_for(run_turn(), AGENT_TURN_TIMEOUT)
+            except asyncio.TimeoutError:
+                print(f"Agent turn timed out after {AGENT_TURN_TIMEOUT:.0f}s")
+                events.put(self._timeout_event(streamed_text))
+            except asyncio.CancelledError:
+                print("Agent turn cancelled")
+                raise
             except Exception as e:
-                error_msg = str(e)
-                print(f"Error in thread: {error_msg}")
-                if "insufficient_quota" in error_msg:
-                    return "Sorry, I can't process your request right now. The API quota has been reached. Please update your API key in settings or try again later."
-                return f"I encountered an issue while processing your request: {error_msg}"
+                events.put({"type": "error", "content": self._format_run_error(e)})
             finally:
-                loop.close()
+                events.put(None)
+
+        future = get_async_worker().submit(run_query_streamed(), key=context.session_id if context else None)
+        # Backstop for a worker loop blocked by a synchronous tool, which the in-loop deadline cannot interrupt
+        deadline = time.monotonic() + AGENT_TURN_TIMEOUT + 5
+
+        try:
+            while True:
+                try:
+                    stream_event = events.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    print("Agent turn did not finish by its deadline")
+                    yield self._timeout_event(streamed_text)
+                    break
+                if stream_event is None:
+                    break
+                yield stream_event
+        finally:
+            # The user sent another message or the turn timed out: stop spending tokens on it
+            future.cancel()
+
+    async def _stream_run(self, agent, user_query, context, emit):
+        """
+        Run an agent with streaming, passing chat UI events to emit.
+
+        Returns:
+            RunResultStreaming: The completed run
+        """
+        result = Runner.run_streamed(
+            starting_agent=agent,
+            input=user_query,
+            context=context,
+            run_config=self.run_config
+        )
+        async for event in result.stream_events():
+            stream_event = self._convert_stream_event(event)
+            if stream_event:
+                emit(stream_event)
+        # stream_events swallows cancellation and just stops, so re-raise it here
+        if not result.is_complete:
+            raise asyncio.CancelledError()
+        return result
+
+    def _route(self, user_query):
+        """
+        Pick where a message starts: a key of self.agents, COMBINED, or "triage".
+
+        Clear-cut messages go straight to a specialist agent, skipping the triage hop.
+        """
+        if ROUTER_ENABLED:
+            target = get_intent_router().route(user_query)
+            if target == COMBINED or target in self.agents:
+                return target
+        return "triage"
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(run_async_in_thread)
-            return future.result()
+    async def _run_combined(self, user_query, context, emit):
+        """
+        Run the ASC and Job Search agents concurrently and merge their answers.
+
+        The turn takes about as long as the slower of the two agents. The ASC answer
+        is streamed as it is generated and the job search section follows. If the
+        job search fails, the streamed ASC answer stands and a short note replaces
+        the job listings.
+
+        Returns:
+            str: The merged answer, or None if the job search failed (so the partial
+                 answer is not cached)
+        """
+        start = time.perf_counter()
+        job_run = asyncio.ensure_future(Runner.run(
+            starting_agent=self.agents["job_search"],
+            input=user_query,
+            context=context,
+            run_config=self.run_config
+        ))
+
+        def emit_asc(event):
+            if event["type"] != "handoff":
+                emit(event)
+
+        try:
+            emit({"type": "handoff", "agent": f"{self.agents['asc_retrieval'].name} and {self.agents['job_search'].name}"})
+            emit({"type": "text", "content": COMBINED_CAREERS_HEADER})
+            asc_result = await self._stream_run(self.agents["asc_retrieval"], user_query, context, emit_asc)
+            try:
+                job_result = await job_run
+            except Exception as e:
+                print(f"Job search failed in a combined turn: {e}")
+                emit({"type": "text", "content": f"{COMBINED_JOBS_HEADER}{COMBINED_JOBS_FAILED}"})
+                return None
+        finally:
+            job_run.cancel()
+
+        jobs_section = f"{COMBINED_JOBS_HEADER}{job_result.final_output}"
+        emit({"type": "text", "content": jobs_section})
+
+        print(f"Combined turn completed in {time.perf_counter() - start:.2f}s with "
+              f"{len(asc_result.raw_responses) + len(job_result.raw_responses)} model call(s); "
+              f"scheduler: {self.call_scheduler.stats()}")
+        return f"{COMBINED_CAREERS_HEADER}{asc_result.final_output}{jobs_section}"
+
+    def _agent_key(self, agent):
+        """Key of an agent in self.agents, or "triage" for the triage agent."""
+        for key, specialist in self.agents.items():
+            if specialist is agent:
+                return key
+        return "triage"
+
+    def _log_turn(self, start, result):
+        """Log the latency and number of model calls of a completed turn, with the scheduler's queueing stats."""
+        print(f"Turn completed in {time.perf_counter() - start:.2f}s with "
+              f"{len(result.raw_responses)} model call(s), last agent: {result.last_agent.name}; "
+              f"scheduler: {self.call_scheduler.stats()}")
+
+    @staticmethod
+    def _convert_stream_event(event):
+        """Convert an Agents SDK stream event into a chat UI event, or None to drop it."""
+        if event.type == "raw_response_event":
+            if isinstance(event.data, ResponseTextDeltaEvent) and event.data.delta:
+                return {"type": "text", "content": event.data.delta}
+        elif event.type == "agent_updated_stream_event":
+            return {"type": "handoff", "agent": event.new_agent.name}
+        elif event.type == "run_item_stream_event" and event.item.type == "tool_call_item":
+            raw_item = event.item.raw_item
+            return {"type": "tool", "name": getattr(raw_item, "name", None) or raw_item.type}
+        return None
+
+    @staticmethod
+    def _timeout_event(streamed_text):
+        """Event ending a turn that ran out of time: a note after the partial answer, or an error."""
+        if streamed_text:
+            return {"type": "text", "content": f"\n\n_{TURN_TIMEOUT_NOTE}_"}
+        return {"type": "error", "content": TURN_TIMEOUT_NOTE}
+
+    @staticmethod
+    def _format_run_error(e):
+        """Turn an exception raised during an agent run into a chat message."""
+        error_msg = str(e)
+        print(f"Error in agent run: {error_msg}")
+        if "insufficient_quota" in error_msg:
+            return "Sorry, I can't process your request right now. The API quota has been reached. Please update your API key in settings or try again later."
+        return f"I encountered an issue while processing your request: {error_msg}"
\ No newline at end of file
@@ -0,0 +1,72 @@
+# utils/agents/async_worker.py
+import asyncio
+import threading
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+class AsyncWorker:
+    """
+    Long-lived asyncio event loop running in a background thread.
+
+    Agent runs from every Streamlit session are scheduled on this one loop, so the
+    OpenAI HTTP connection pool and client state survive between chat turns.
+    """
+
+    def __init__(self, name="agent-worker"):
+        self.loop = asyncio.new_event_loop()
+        self._active = {}
+        self._active_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run_loop, name=name, daemon=True)
+        self.thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def is_alive(self):
+        return self.thread.is_alive() and not self.loop.is_closed()
+
+    def submit(self, coro, key=None):
+        """
+        Schedule a coroutine on the worker loop. Safe to call from any thread.
+
+        Args:
+            coro: Coroutine to run
+            key: Optional key, e.g. a chat session id. A still-running coroutine
+                 submitted earlier with the same key is cancelled.
+
+        Returns:
+            concurrent.futures.Future: Future resolved with the coroutine's result
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if key is None:
+            return future
+
+        with self._active_lock:
+            previous = self._active.get(key)
+            self._active[key] = future
+        if previous and previous.cancel():
+            print(f"Cancelled superseded run for {key}")
+        future.add_done_callback(lambda done: self._release(key, done))
+        return future
+
+    def _release(self, key, future):
+        with self._active_lock:
+            if self._active.get(key) is future:
+                del self._active[key]
+
+
+def get_async_worker():
+    """Return the process-wide AsyncWorker, starting it on first use."""
+    global _worker
+
+    if _worker and _worker.is_alive():
+        return _worker
+
+    with _worker_lock:
+        if not _worker or not _worker.is_alive():
+            _worker = AsyncWorker()
+            print("Started background agent worker loop")
+        return _worker
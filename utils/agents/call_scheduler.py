@@ -0,0 +1,285 @@
+# utils/agents/call_scheduler.py
+import asyncio
+import contextvars
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import openai
+from agents.models.interface import Model, ModelProvider
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from utils.agents.client_pool import is_retryable
+
+# Model calls in flight at once, per API key
+MODEL_MAX_CONCURRENCY = int(os.environ.get("MODEL_MAX_CONCURRENCY", 8))
+# Token budget per minute, per API key; 0 disables the token limit
+MODEL_TOKENS_PER_MINUTE = int(os.environ.get("MODEL_TOKENS_PER_MINUTE", 90000))
+# Attempts per model call on rate limits and server errors
+MODEL_MAX_RETRIES = int(os.environ.get("MODEL_MAX_RETRIES", 5))
+# Output tokens reserved per call until the actual usage is known
+MODEL_OUTPUT_TOKENS_ESTIMATE = 800
+
+# Chat session the current agent run belongs to, used to queue calls fairly
+current_session = contextvars.ContextVar("current_session", default=None)
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def estimate_tokens(*parts):
+    """Rough token count of a request (4 characters per token) plus the output reserve."""
+    return sum(len(str(part)) for part in parts if part) // 4 + MODEL_OUTPUT_TOKENS_ESTIMATE
+
+
+def usage_tokens(result):
+    """Total tokens reported by a model response or a response.completed stream event, or None."""
+    usage = getattr(result, "usage", None) or getattr(getattr(result, "response", None), "usage", None)
+    return getattr(usage, "total_tokens", None)
+
+
+class CallScheduler:
+    """
+    Admission control for the model calls made with one API key.
+
+    A call starts once a concurrency slot is free and the token bucket (refilled
+    continuously at tokens_per_minute) holds its estimated tokens. Calls that cannot
+    start wait in one queue per chat session, served round-robin, so one busy
+    session cannot starve the others. Rate limit and server errors are retried
+    with jittered exponential backoff; a rate limit also empties the bucket so the
+    queued calls back off together.
+
+    The scheduler lives on the agent worker loop and must only be used from it.
+    """
+
+    def __init__(self, max_concurrency=MODEL_MAX_CONCURRENCY, tokens_per_minute=MODEL_TOKENS_PER_MINUTE,
+                 max_retries=MODEL_MAX_RETRIES):
+        self.max_concurrency = max_concurrency
+        self.tokens_per_minute = tokens_per_minute
+        self.max_retries = max_retries
+        self._in_flight = 0
+        self._tokens = float(tokens_per_minute)
+        self._refilled = time.monotonic()
+        self._queues = OrderedDict()
+        self._wakeup = None
+        self.calls = 0
+        self.retries = 0
+        self.queued = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    async def call(self, make_call, estimated_tokens):
+        """
+        Await make_call() once admitted, retrying transient errors.
+
+        Args:
+            make_call: Callable returning a new awaitable for each attempt
+            estimated_tokens: Tokens reserved until the response reports its usage
+        """
+        self.calls += 1
+        async for attempt in self._retrying():
+            with attempt:
+                tokens = await self._acquire(estimated_tokens)
+                used = None
+                try:
+                    result = await make_call()
+                    used = usage_tokens(result)
+                    return result
+                finally:
+                    self._release(tokens, used)
+
+    async def stream(self, make_stream, estimated_tokens):
+        """
+        Yield the events of make_stream() once admitted.
+
+        Errors before the first event are retried; after that the stream has been
+        partly consumed and errors propagate.
+        """
+        self.calls += 1
+        async for attempt in self._retrying():
+            with attempt:
+                tokens = await self._acquire(estimated_tokens)
+                try:
+                    events = make_stream()
+                    first = await events.__anext__()
+                except BaseException:
+                    self._release(tokens, None)
+                    raise
+
+        used = None
+        try:
+            yield first
+            async for event in events:
+                used = usage_tokens(event) or used
+                yield event
+        finally:
+            self._release(tokens, used)
+
+    def _retrying(self):
+        return AsyncRetrying(
+            stop=stop_after_attempt(self.max_retries),
+            wait=wait_random_exponential(multiplier=0.5, max=30),
+            retry=retry_if_exception(is_retryable),
+            before_sleep=self._on_retry,
+            reraise=True
+        )
+
+    def _on_retry(self, retry_state):
+        self.retries += 1
+        error = retry_state.outcome.exception()
+        print(f"Model call failed ({type(error).__name__}), retry {retry_state.attempt_number}")
+        if isinstance(error, openai.RateLimitError):
+            self._tokens = min(self._tokens, 0.0)
+
+    async def _acquire(self, tokens):
+        """Wait for a slot and tokens. Returns the tokens taken from the bucket."""
+        tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+        self._refill()
+        if not self._queues and self._can_start(tokens):
+            self._start(tokens)
+            return tokens
+
+        session = current_session.get()
+        waiter = (asyncio.get_running_loop().create_future(), tokens)
+        self._queues.setdefault(session, deque()).append(waiter)
+        self.queued += 1
+        # Admit it now if possible, or schedule the wakeup for when the bucket has refilled
+        self._dispatch()
+        start = time.perf_counter()
+        try:
+            await waiter[0]
+        except asyncio.CancelledError:
+            if waiter[0].done() and not waiter[0].cancelled():
+                # Admitted just as the caller was cancelled: hand the slot back
+                self._release(tokens, None)
+            else:
+                self._remove_waiter(session, waiter)
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            self.wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+        return tokens
+
+    def _can_start(self, tokens):
+        return self._in_flight < self.max_concurrency and (not self.tokens_per_minute or self._tokens >= tokens)
+
+    def _start(self, tokens):
+        self._in_flight += 1
+        self._tokens -= tokens
+
+    def _release(self, tokens, used):
+        self._in_flight -= 1
+        if used is not None and self.tokens_per_minute:
+            self._tokens -= used - tokens
+        self._dispatch()
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute,
+                               self._tokens + (now - self._refilled) * self.tokens_per_minute / 60)
+        self._refilled = now
+
+    def _dispatch(self):
+        """Admit queued calls, one session at a time, while slots and tokens last."""
+        self._refill()
+        while self._queues and self._in_flight < self.max_concurrency:
+            session, waiters = next(iter(self._queues.items()))
+            future, tokens = waiters[0]
+            if future.cancelled():
+                # The waiting caller removes itself once it runs again
+                waiters.popleft()
+                if not waiters:
+                    del self._queues[session]
+                continue
+            if self.tokens_per_minute and self._tokens < tokens:
+                self._schedule_wakeup((tokens - self._tokens) * 60 / self.tokens_per_minute)
+                return
+
+            waiters.popleft()
+            if waiters:
+                self._queues.move_to_end(session)
+            else:
+                del self._queues[session]
+            self._start(tokens)
+            future.set_result(None)
+
+    def _schedule_wakeup(self, delay):
+        if self._wakeup:
+            self._wakeup.cancel()
+        self._wakeup = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _remove_waiter(self, session, waiter):
+        waiters = self._queues.get(session)
+        if waiters and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self._queues[session]
+        self._dispatch()
+
+    def queue_depth(self):
+        return sum(len(waiters) for waiters in self._queues.values())
+
+    def stats(self):
+        """Queue depth, calls in flight, token budget and queueing delay."""
+        return {
+            "queue_depth": self.queue_depth(),
+            "in_flight": self._in_flight,
+            "tokens_available": int(self._tokens) if self.tokens_per_minute else None,
+            "calls": self.calls,
+            "queued": self.queued,
+            "retries": self.retries,
+            "avg_wait_ms": self.wait_seconds / self.queued * 1000 if self.queued else 0.0,
+            "max_wait_ms": self.max_wait_seconds * 1000,
+        }
+
+
+class ThrottledModel(Model):
+    """Model whose calls go through a CallScheduler."""
+
+    def __init__(self, model, scheduler):
+        self.model = model
+        self.scheduler = scheduler
+
+    async def get_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing):
+        return await self.scheduler.call(
+            lambda: self.model.get_response(system_instructions, input, model_settings, tools,
+                                            output_schema, handoffs, tracing),
+            estimate_tokens(system_instructions, input)
+        )
+
+    def stream_response(self, system_instructions, input, model_settings, tools, output_schema, handoffs, tracing):
+        return self.scheduler.stream(
+            lambda: self.model.stream_response(system_instructions, input, model_settings, tools,
+                                               output_schema, handoffs, tracing),
+            estimate_tokens(system_instructions, input)
+        )
+
+
+class ThrottledModelProvider(ModelProvider):
+    """Model provider wrapping every model it returns in a ThrottledModel."""
+
+    def __init__(self, provider, scheduler):
+        self.provider = provider
+        self.scheduler = scheduler
+
+    def get_model(self, model_name):
+        return ThrottledModel(self.provider.get_model(model_name), self.scheduler)
+
+
+def get_call_scheduler(api_key):
+    """Return the process-wide CallScheduler for an API key."""
+    key = hashlib.sha256((api_key or "").encode()).hexdigest()
+
+    scheduler = _schedulers.get(key)
+    if scheduler:
+        return scheduler
+
+    with _schedulers_lock:
+        if key not in _schedulers:
+            _schedulers[key] = CallScheduler()
+        return _schedulers[key]
@@ -0,0 +1,105 @@
+# utils/agents/client_pool.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import httpx
+import openai
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# API keys whose clients are kept; the least recently used are dropped beyond this
+OPENAI_CLIENT_POOL_SIZE = int(os.environ.get("OPENAI_CLIENT_POOL_SIZE", 32))
+# Connections shared by all clients, per HTTP client (sync and async)
+OPENAI_MAX_CONNECTIONS = int(os.environ.get("OPENAI_MAX_CONNECTIONS", 64))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def is_retryable(error):
+    """
+    Whether an OpenAI error is transient: rate limits, server errors and dropped
+    connections. An exhausted quota is also a 429 but does not recover by retrying.
+    """
+    if getattr(error, "code", None) == "insufficient_quota":
+        return False
+    return isinstance(error, (
+        openai.APIConnectionError,
+        openai.APITimeoutError,
+        openai.RateLimitError,
+        openai.InternalServerError
+    ))
+
+
+class ClientPool:
+    """
+    LRU pool of OpenAI clients keyed by a hash of the API key.
+
+    Every client is configured with its key explicitly, so sessions using
+    different keys never go through the process environment. All clients share
+    one sync and one async HTTP connection pool, so connections are reused across
+    turns and sessions. The async clients do not retry on their own: their calls go
+    through the CallScheduler, which does.
+    """
+
+    def __init__(self, max_entries=OPENAI_CLIENT_POOL_SIZE, max_connections=OPENAI_MAX_CONNECTIONS):
+        self.max_entries = max_entries
+        limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        self.http_client = DefaultHttpxClient(limits=limits)
+        self.async_http_client = DefaultAsyncHttpxClient(limits=limits)
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, api_key):
+        """
+        Return the (OpenAI, AsyncOpenAI) clients for an API key, creating them on first use.
+        """
+        key = hashlib.sha256(api_key.encode()).hexdigest()
+
+        with self._lock:
+            clients = self._clients.get(key)
+            if clients:
+                self._clients.move_to_end(key)
+                self.hits += 1
+                return clients
+
+            self.misses += 1
+            clients = (
+                OpenAI(api_key=api_key, http_client=self.http_client),
+                AsyncOpenAI(api_key=api_key, http_client=self.async_http_client, max_retries=0),
+            )
+            self._clients[key] = clients
+            # Evicted clients are not closed: the HTTP clients they use are shared
+            while len(self._clients) > self.max_entries:
+                self._clients.popitem(last=False)
+            return clients
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._clients)}
+
+
+def get_client_pool():
+    """Return the process-wide ClientPool."""
+    global _pool
+
+    if _pool:
+        return _pool
+
+    with _pool_lock:
+        if not _pool:
+            _pool = ClientPool()
+        return _pool
+
+
+def get_openai_client(api_key):
+    """Pooled sync OpenAI client for an API key."""
+    return get_client_pool().get(api_key)[0]
+
+
+def get_async_openai_client(api_key):
+    """Pooled AsyncOpenAI client for an API key. Use it on the agent worker loop only."""
+    return get_client_pool().get(api_key)[1]
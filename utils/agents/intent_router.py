@@ -0,0 +1,214 @@
+# utils/agents/intent_router.py
+import json
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+INTENT_EXAMPLES_PATH = os.path.join(os.path.dirname(__file__), "intent_examples.json")
+# Minimum probability for routing straight to a specialist agent
+ROUTER_THRESHOLD = float(os.environ.get("ROUTER_THRESHOLD", 0.75))
+# Set to "0" to always start at the triage agent
+ROUTER_ENABLED = os.environ.get("ROUTER_ENABLED", "1") != "0"
+
+LABELS = ["asc_retrieval", "job_search", "triage"]
+# Messages asking for both career matches and job listings run both specialists at once
+COMBINED = "combined"
+# Minimum probability of each specialist for a combined route
+COMBINED_MIN_PROBABILITY = 0.35
+FEATURE_BITS = 12
+
+# Phrases that settle the intent on their own, matched on word boundaries; a trailing
+# "*" matches any word ending. Words with everyday meanings ("seek", "indeed",
+# "opening") are left to the classifier.
+KEYWORDS = {
+    "asc_retrieval": ["anzsco", "skills classification", "career path*", "careers match", "career recommendation*",
+                      "which occupation*", "what occupation*", "core competenc*", "specialist task*",
+                      "which careers", "what careers", "careers fit", "careers suit"],
+    "job_search": ["hiring", "job listing*", "job opening*", "job ad", "job ads", "vacanc*", "linkedin",
+                   "interview*", "cover letter*", "recruiting", "job market"],
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9+#']+")
+
+
+def _keyword_pattern(phrases):
+    alternatives = [re.escape(phrase.rstrip("*")) + (r"\w*" if phrase.endswith("*") else "") for phrase in phrases]
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+
+
+KEYWORD_PATTERNS = {label: _keyword_pattern(phrases) for label, phrases in KEYWORDS.items()}
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def _features(text):
+    """Hashed, L2-normalised unigram and bigram features: (indices, values)."""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not grams:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+
+    counts = {}
+    for gram in grams:
+        index = zlib.crc32(gram.encode()) & ((1 << FEATURE_BITS) - 1)
+        counts[index] = counts.get(index, 0) + 1
+    indices = np.fromiter(counts.keys(), dtype=np.int64)
+    values = 1 + np.log(np.fromiter(counts.values(), dtype=np.float32))
+    return indices, values / np.linalg.norm(values)
+
+
+class IntentRouter:
+    """
+    Local classifier deciding which agent should answer a message.
+
+    Keyword rules catch unambiguous messages; otherwise a small multinomial logistic
+    regression over hashed n-gram features, trained on the labelled examples at
+    startup, predicts the intent. Messages are only routed to a specialist when the
+    prediction is confident; everything else goes to the triage agent.
+    """
+
+    def __init__(self, weights, bias, threshold=ROUTER_THRESHOLD):
+        self.weights = weights
+        self.bias = bias
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.routed = {label: 0 for label in LABELS + [COMBINED]}
+        self.fallbacks = 0
+        self.total_seconds = 0.0
+
+    @classmethod
+    def train(cls, examples, epochs=300, learning_rate=2.0, l2=1e-3, threshold=ROUTER_THRESHOLD):
+        """Train on [text, label] pairs with full-batch gradient descent."""
+        features = np.zeros((len(examples), 1 << FEATURE_BITS), dtype=np.float32)
+        for row, (text, _) in enumerate(examples):
+            indices, values = _features(text)
+            features[row, indices] = values
+        targets = np.eye(len(LABELS), dtype=np.float32)[[LABELS.index(label) for _, label in examples]]
+
+        weights = np.zeros((len(LABELS), features.shape[1]), dtype=np.float32)
+        bias = np.zeros(len(LABELS), dtype=np.float32)
+        for _ in range(epochs):
+            probabilities = _softmax(features @ weights.T + bias)
+            error = (probabilities - targets) / len(examples)
+            weights -= learning_rate * (error.T @ features + l2 * weights)
+            bias -= learning_rate * error.sum(axis=0)
+
+        return cls(weights, bias, threshold)
+
+    def predict(self, text):
+        """
+        Classify a message.
+
+        Returns:
+            tuple: (label, confidence)
+        """
+        lowered = text.lower()
+        keyword_labels = [label for label, pattern in KEYWORD_PATTERNS.items() if pattern.search(lowered)]
+        if len(keyword_labels) == 1:
+            return keyword_labels[0], 1.0
+        if len(keyword_labels) == 2:
+            return COMBINED, 1.0
+
+        indices, values = _features(text)
+        probabilities = _softmax(self.weights[:, indices] @ values + self.bias)
+        asc_probability, job_probability = probabilities[0], probabilities[1]
+        if min(asc_probability, job_probability) >= COMBINED_MIN_PROBABILITY:
+            return COMBINED, float(asc_probability + job_probability)
+        best = int(np.argmax(probabilities))
+        return LABELS[best], float(probabilities[best])
+
+    def route(self, text):
+        """
+        Return the specialist agent key for a message, COMBINED to run both
+        specialists, or None to start at triage.
+        """
+        start = time.perf_counter()
+        label, confidence = self.predict(text)
+        target = label if label != "triage" and confidence >= self.threshold else None
+
+        with self._lock:
+            self.total_seconds += time.perf_counter() - start
+            if target:
+                self.routed[target] += 1
+            else:
+                self.fallbacks += 1
+        return target
+
+    def stats(self):
+        """Routing counts and average routing latency."""
+        with self._lock:
+            total = sum(self.routed.values()) + self.fallbacks
+            return {
+                "routed": dict(self.routed),
+                "triage_fallbacks": self.fallbacks,
+                "bypass_rate": (total - self.fallbacks) / total if total else 0.0,
+                "avg_route_us": self.total_seconds / total * 1e6 if total else 0.0,
+            }
+
+
+def _softmax(logits):
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def _load_examples(path=INTENT_EXAMPLES_PATH):
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def get_intent_router():
+    """Return the process-wide IntentRouter, training it on first use."""
+    global _router
+
+    if _router:
+        return _router
+
+    with _router_lock:
+        if not _router:
+            _router = IntentRouter.train(_load_examples()["train"])
+        return _router
+
+
+def evaluate(router, examples):
+    """
+    Offline evaluation on [text, label] pairs.
+
+    Returns:
+        dict: accuracy of the raw prediction, share of messages routed past triage,
+              precision of those routes and mean latency per message
+    """
+    correct = routed = routed_correct = 0
+    start = time.perf_counter()
+    for text, label in examples:
+        predicted, confidence = router.predict(text)
+        correct += predicted == label
+        if predicted != "triage" and confidence >= router.threshold:
+            routed += 1
+            routed_correct += predicted == label
+    elapsed = time.perf_counter() - start
+
+    return {
+        "accuracy": correct / len(examples),
+        "routed": routed / len(examples),
+        "routed_precision": routed_correct / routed if routed else 0.0,
+        "avg_predict_us": elapsed / len(examples) * 1e6,
+    }
+
+
+def main():
+    examples = _load_examples()
+    start = time.perf_counter()
+    router = IntentRouter.train(examples["train"])
+    print(f"Trained on {len(examples['train'])} examples in {(time.perf_counter() - start) * 1000:.0f} ms")
+    for split in ("train", "eval"):
+        metrics = evaluate(router, examples[split])
+        print(f"{split:>5}: " + ", ".join(f"{name}={value:.3f}" for name, value in metrics.items()))
+
+
+if __name__ == "__main__":
+    main()
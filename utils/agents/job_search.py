@@ -0,0 +1,208 @@
+# utils/agents/job_search.py
+import asyncio
+import datetime
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+from openai import AsyncOpenAI
+
+from utils.agents.call_scheduler import estimate_tokens, get_call_scheduler
+from utils.agents.client_pool import get_async_openai_client, get_client_pool
+
+# Seconds a job search result stays valid (results are also bucketed by day)
+JOB_SEARCH_TTL = float(os.environ.get("JOB_SEARCH_TTL", 6 * 60 * 60))
+JOB_SEARCH_CACHE_SIZE = int(os.environ.get("JOB_SEARCH_CACHE_SIZE", 1024))
+# When set, job searches go to this local fixture server instead of live web search
+JOB_SEARCH_FIXTURE_URL = os.environ.get("JOB_SEARCH_FIXTURE_URL")
+JOB_SEARCH_MODEL = os.environ.get("JOB_SEARCH_MODEL", "gpt-4o")
+
+# States and territories by lowercase name and abbreviation
+AUSTRALIAN_REGIONS = {
+    "new south wales": "New South Wales", "nsw": "New South Wales",
+    "victoria": "Victoria", "vic": "Victoria",
+    "queensland": "Queensland", "qld": "Queensland",
+    "western australia": "Western Australia", "wa": "Western Australia",
+    "south australia": "South Australia", "sa": "South Australia",
+    "tasmania": "Tasmania", "tas": "Tasmania",
+    "australian capital territory": "Australian Capital Territory", "act": "Australian Capital Territory",
+    "northern territory": "Northern Territory", "nt": "Northern Territory",
+}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def normalize_term(text):
+    return " ".join(text.lower().split())
+
+
+def describe_location(location):
+    """
+    Split a search location into the place named in the prompt and the web search user_location.
+
+    "Australia" (or nothing) searches the whole country, a state or territory sets
+    the region, and anything else is taken to be a city.
+
+    Returns:
+        tuple: (place, user_location)
+    """
+    place = " ".join((location or "").split())
+    if place.lower().endswith(", australia"):
+        place = place[:-len(", australia")].strip()
+    user_location = {"type": "approximate", "country": "AU"}
+
+    if not place or place.lower() == "australia":
+        return "Australia", user_location
+    region = AUSTRALIAN_REGIONS.get(place.lower())
+    if region:
+        return f"{region}, Australia", dict(user_location, region=region)
+    return f"{place}, Australia", dict(user_location, city=place)
+
+
+class OpenAIWebSearchBackend:
+    """Live job search through the Responses API web search tool."""
+
+    def __init__(self, api_key):
+        self.api_key = api_key
+        self.scheduler = get_call_scheduler(api_key)
+        self._client = None
+
+    @property
+    def client(self):
+        """
+        The AsyncOpenAI client, created on first use. Without an API key it is the
+        default client, which reads OPENAI_API_KEY like OpenAIProvider() does, so
+        a manager can still be created before a key is known.
+        """
+        if self._client is None:
+            if self.api_key:
+                self._client = get_async_openai_client(self.api_key)
+            else:
+                self._client = AsyncOpenAI(http_client=get_client_pool().async_http_client, max_retries=0)
+        return self._client
+
+    async def search(self, role, location):
+        place, user_location = describe_location(location)
+        prompt = (
+            f"Find current job listings for '{role}' in {place}, from sites like Seek, "
+            "LinkedIn and Indeed. For each listing give the job title, company, location, key "
+            "requirements and the link. List up to 10 listings."
+        )
+        response = await self.scheduler.call(
+            lambda: self.client.responses.create(
+                model=JOB_SEARCH_MODEL,
+                tools=[{"type": "web_search_preview", "user_location": user_location}],
+                input=prompt
+            ),
+            estimate_tokens(prompt)
+        )
+        return response.output_text
+
+
+class FixtureBackend:
+    """
+    Job search against a local fixture server, for testing and benchmarks.
+
+    The server must answer GET {base_url}/jobs?role=...&location=... with either
+    plain text or a JSON list of listings (title, company, location, requirements, url).
+    """
+
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(timeout=30)
+
+    async def search(self, role, location):
+        response = await self.client.get(f"{self.base_url}/jobs", params={"role": role, "location": location})
+        response.raise_for_status()
+        if "json" not in response.headers.get("content-type", ""):
+            return response.text
+        return "\n".join(
+            f"- {job.get('title', '')} at {job.get('company', '')} ({job.get('location', '')}): "
+            f"{job.get('requirements', '')} {job.get('url', '')}".strip()
+            for job in response.json()
+        )
+
+
+def create_job_search_backend(api_key):
+    """Fixture backend if JOB_SEARCH_FIXTURE_URL is set, live web search otherwise."""
+    if JOB_SEARCH_FIXTURE_URL:
+        return FixtureBackend(JOB_SEARCH_FIXTURE_URL)
+    return OpenAIWebSearchBackend(api_key)
+
+
+class JobSearchCache:
+    """
+    TTL + LRU cache of job search results keyed by normalised role, location and day.
+
+    Concurrent lookups for the same key share one backend call.
+    """
+
+    def __init__(self, ttl=JOB_SEARCH_TTL, max_entries=JOB_SEARCH_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(role, location):
+        return normalize_term(role), normalize_term(location), datetime.date.today().isoformat()
+
+    async def search(self, backend, role, location):
+        """Return job listings for role and location, calling backend.search on a miss."""
+        key = self.make_key(role, location)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+            task = self._in_flight.get(key)
+            if not task:
+                task = asyncio.ensure_future(backend.search(role, location))
+                task.add_done_callback(lambda done: self._store(key, done))
+                self._in_flight[key] = task
+
+        # Shielded so one cancelled caller does not cancel the search for the others
+        return await asyncio.shield(task)
+
+    def _store(self, key, task):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            if task.cancelled() or task.exception():
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, task.result())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
+
+
+def get_job_search_cache():
+    """Return the process-wide JobSearchCache."""
+    global _cache
+
+    if _cache:
+        return _cache
+
+    with _cache_lock:
+        if not _cache:
+            _cache = JobSearchCache()
+        return _cache
@@ -0,0 +1,62 @@
+# utils/agents/registry.py
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+from utils.agents.agent_manager import AgentManager
+from utils.asc_data import get_kb_version
+
+# Agent managers kept; the least recently used are dropped beyond this
+AGENT_MANAGER_CACHE_SIZE = int(os.environ.get("AGENT_MANAGER_CACHE_SIZE", 16))
+
+_managers = OrderedDict()
+# Guards _managers and _key_locks only; building a manager holds just its key's lock
+_managers_lock = threading.Lock()
+_key_locks = {}
+
+
+def get_agent_manager(api_key):
+    """
+    Return the process-wide AgentManager for an API key.
+
+    The agents and the vector store handle are built once per (API key, KB version)
+    and shared by every Streamlit session, instead of once per session. At most
+    AGENT_MANAGER_CACHE_SIZE managers are kept, least recently used evicted first.
+
+    Args:
+        api_key: OpenAI API key of the requesting session
+
+    Returns:
+        AgentManager: Initialized manager, or None if initialization failed
+    """
+    key = (hashlib.sha256(api_key.encode()).hexdigest(), get_kb_version())
+
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager:
+            _managers.move_to_end(key)
+            return manager
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # A slow or failing key only blocks sessions using the same key
+    with key_lock:
+        with _managers_lock:
+            manager = _managers.get(key)
+        if manager:
+            return manager
+
+        manager = AgentManager(api_key=api_key)
+        if not manager.initialize_agents():
+            with _managers_lock:
+                _key_locks.pop(key, None)
+            return None
+
+        with _managers_lock:
+            _managers[key] = manager
+            _managers.move_to_end(key)
+            while len(_managers) > AGENT_MANAGER_CACHE_SIZE:
+                evicted, _ = _managers.popitem(last=False)
+                _key_locks.pop(evicted, None)
+        print(f"Agent system built for API key starting with: {api_key[:5]}... (KB version {key[1]})")
+        return manager
@@ -0,0 +1,117 @@
+# utils/agents/response_cache.py
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", 2048))
+# Seconds a cached answer stays valid, by the agent that produced it
+RESPONSE_CACHE_TTLS = {
+    "job_search": float(os.environ.get("RESPONSE_CACHE_JOB_TTL", 15 * 60)),
+    "asc_retrieval": float(os.environ.get("RESPONSE_CACHE_ASC_TTL", 24 * 60 * 60)),
+    "triage": float(os.environ.get("RESPONSE_CACHE_TRIAGE_TTL", 60 * 60)),
+}
+# Set to "1" to also serve queries that differ from a cached one only in filler words
+RESPONSE_CACHE_NEAR_DUPLICATES = os.environ.get("RESPONSE_CACHE_NEAR_DUPLICATES", "0") == "1"
+
+# Words that never change what a query asks for. Negations, places, skills and
+# connectives all matter, so they are never ignored.
+FILLER_WORDS = {"a", "an", "the", "please", "pls", "can", "could", "would", "you", "me", "i", "hi", "hello",
+                "hey", "thanks", "thank", "tell", "show", "give", "some", "just", "know", "like", "to"}
+
+
+def normalize_query(query):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", query.lower()).split())
+
+
+def profile_hash(profile):
+    """Stable hash of a user profile, so answers are only shared between identical profiles."""
+    return hashlib.sha256(json.dumps(profile, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def content_key(normalized):
+    """The words of a normalised query that carry meaning, in their original order."""
+    return " ".join(word for word in normalized.split() if word not in FILLER_WORDS)
+
+
+class ResponseCache:
+    """
+    LRU cache of agent answers keyed by normalised query and profile hash.
+
+    Entries expire after the TTL of the agent that answered. With near-duplicate
+    matching, a query that misses exactly can still hit an entry for the same
+    profile whose query has the same content words in the same order ("can you
+    show me nursing jobs in Hobart" and "nursing jobs in Hobart"). Fuzzier
+    matching served wrong answers for queries differing in one word or in word
+    order, so it is not attempted.
+    """
+
+    def __init__(self, max_entries=RESPONSE_CACHE_SIZE, ttls=None, near_duplicates=RESPONSE_CACHE_NEAR_DUPLICATES):
+        self.max_entries = max_entries
+        self.ttls = ttls or RESPONSE_CACHE_TTLS
+        self.near_duplicates = near_duplicates
+        self._entries = OrderedDict()
+        # (profile hash, content key) -> key of the newest entry with that content
+        self._content_index = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, query, profile):
+        """Return the cached answer for query and profile, or None."""
+        normalized = normalize_query(query)
+        key = (profile_hash(profile), normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires"] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry["response"]
+
+            if self.near_duplicates:
+                other_key = self._content_index.get((key[0], content_key(normalized)))
+                other = self._entries.get(other_key)
+                if other and other["expires"] > now:
+                    self._entries.move_to_end(other_key)
+                    self.near_hits += 1
+                    return other["response"]
+
+            self.misses += 1
+            return None
+
+    def put(self, query, profile, response, agent_key):
+        """Cache an answer produced by the agent with the given key."""
+        normalized = normalize_query(query)
+        key = (profile_hash(profile), normalized)
+        ttl = self.ttls.get(agent_key, self.ttls["triage"])
+
+        with self._lock:
+            self._entries[key] = {
+                "response": response,
+                "content_key": (key[0], content_key(normalized)),
+                "expires": time.monotonic() + ttl,
+            }
+            self._entries.move_to_end(key)
+            self._content_index[self._entries[key]["content_key"]] = key
+            while len(self._entries) > self.max_entries:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                if self._content_index.get(evicted["content_key"]) == evicted_key:
+                    del self._content_index[evicted["content_key"]]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                "hits": self.hits,
+                "near_hits": self.near_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.near_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+            }
@@ -1,3 +1,53 @@
+import json
+import os
+import threading
+
+ASC_KB_JSON_PATH = "data/asc_knowledge_base.json"
+
+
+def get_kb_version(json_path=ASC_KB_JSON_PATH):
+    """
+    Return a version tag for the local ASC knowledge base.
+
+    The tag changes whenever the knowledge base JSON is replaced, so a redeploy
+    with new data rebuilds whatever was derived from the old one.
+    """
+    try:
+        stat = os.stat(json_path)
+        return f"{stat.st_size}-{stat.st_mtime_ns}"
+    except OSError:
+        return "none"
+
+
+class KBSingleton:
+    """
+    A process-wide object derived from the ASC knowledge base, reloaded when the
+    knowledge base changes.
+
+    get() calls load(kb_version) on first use, and again whenever get_kb_version()
+    differs from the version the current object was loaded for. Loads happen under
+    a lock, so concurrent first callers share one load; later calls take no lock.
+    If load raises, nothing is stored and the next call tries again.
+    """
+
+    def __init__(self, load):
+        self._load = load
+        # (object, kb_version), replaced as a whole so readers never see a mix
+        self._current = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        kb_version = get_kb_version()
+        current = self._current
+        if current and current[1] == kb_version:
+            return current[0]
+
+        with self._lock:
+            if not self._current or self._current[1] != kb_version:
+                self._current = (self._load(kb_version), kb_version)
+            return self._current[0]
+
+
 def get_asc_core_competencies():
     """
     Return the core competencies from the ASC dataset.
@@ -20,4 +70,51 @@ def get_asc_core_competencies():
         "Writing": "The ability to communicate effectively in written form to a range of audiences."
     }
 
-    return core_competencies
\ No newline at end of file
+    return core_competencies
+
+
+def iter_asc_entries(json_path=ASC_KB_JSON_PATH, chunk_size=1 << 20):
+    """
+    Yield the occupation entries of the ASC knowledge base one at a time.
+
+    The file is parsed incrementally, so memory use stays bounded by the size of a
+    single entry rather than the whole dataset.
+
+    Args:
+        json_path: Path to the knowledge base JSON (a list of entries or a single entry)
+        chunk_size: Number of characters read from disk at a time
+
+    Yields:
+        dict: One knowledge base entry
+    """
+    decoder = json.JSONDecoder()
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size)
+        pos = len(buffer) - len(buffer.lstrip())
+
+        if buffer[pos:pos + 1] != "[":
+            yield json.loads(buffer + f.read())
+            return
+        pos += 1
+
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ","):
+                pos += 1
+
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+
+            try:
+                if pos >= len(buffer):
+                    raise json.JSONDecodeError("Buffer exhausted", buffer, pos)
+                entry, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+
+            yield entry
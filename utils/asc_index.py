@@ -0,0 +1,192 @@
+# utils/asc_index.py
+import argparse
+import json
+import os
+import re
+import time
+
+import numpy as np
+from scipy import sparse
+
+from utils.asc_data import ASC_KB_JSON_PATH, KBSingleton, get_kb_version, iter_asc_entries
+from utils.kb_convert import render_occupation
+
+ASC_INDEX_DIR = "data/index"
+# "remote" uses the vector store, "local" the in-process index, "hybrid" both
+ASC_RETRIEVAL_MODE = os.environ.get("ASC_RETRIEVAL_MODE", "remote")
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOP_WORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "into", "is", "it",
+    "of", "on", "or", "that", "the", "to", "with", "what", "which", "who", "my", "me", "i",
+    "anzsco", "description", "required", "core", "competencies", "specialized", "tasks",
+    "technology", "tools", "score",
+}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+
+def tokenize(text):
+    """Lowercase word tokens without stop words."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOP_WORDS]
+
+
+class ASCIndex:
+    """
+    BM25 index over the ASC occupation texts.
+
+    The BM25 term weights are precomputed into a sparse occupation x term matrix,
+    so scoring a query against every occupation is one sparse matrix-vector product.
+    """
+
+    def __init__(self, weights, vocabulary, occupations, kb_version=None):
+        self.weights = weights.tocsc()
+        self.vocabulary = vocabulary
+        self.occupations = occupations
+        self.kb_version = kb_version
+
+    @classmethod
+    def build(cls, json_path=ASC_KB_JSON_PATH):
+        """Build the index from the knowledge base JSON."""
+        vocabulary = {}
+        occupations = []
+        rows, cols, counts = [], [], []
+
+        for row, entry in enumerate(iter_asc_entries(json_path)):
+            metadata = entry.get("metadata", {})
+            text = render_occupation(entry)
+            occupations.append({
+                "anzsco_code": metadata.get("anzsco_code", "Unknown"),
+                "title": metadata.get("title", "Unknown Title"),
+                "text": text.strip(),
+            })
+
+            term_counts = {}
+            for token in tokenize(text):
+                term = vocabulary.setdefault(token, len(vocabulary))
+                term_counts[term] = term_counts.get(term, 0) + 1
+            rows.extend([row] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+
+        tf = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float32), (rows, cols)),
+            shape=(len(occupations), len(vocabulary))
+        )
+
+        doc_lengths = np.asarray(tf.sum(axis=1)).ravel()
+        avg_length = doc_lengths.mean() if len(doc_lengths) else 0.0
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = np.log(1 + (len(occupations) - doc_freq + 0.5) / (doc_freq + 0.5)).astype(np.float32)
+
+        # BM25 term weight for every non-zero (occupation, term) pair
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(avg_length, 1e-9))
+        row_norm = np.repeat(norm, np.diff(tf.indptr)).astype(np.float32)
+        weights = tf.copy()
+        weights.data = idf[tf.indices] * tf.data * (BM25_K1 + 1) / (tf.data + row_norm)
+
+        return cls(weights, vocabulary, occupations, get_kb_version(json_path))
+
+    def save(self, index_dir=ASC_INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        sparse.save_npz(os.path.join(index_dir, "asc_bm25.npz"), self.weights.tocsr())
+        with open(os.path.join(index_dir, "asc_bm25.json"), "w") as f:
+            json.dump({"vocabulary": self.vocabulary, "occupations": self.occupations,
+                       "kb_version": self.kb_version}, f)
+
+    @classmethod
+    def load(cls, index_dir=ASC_INDEX_DIR):
+        weights = sparse.load_npz(os.path.join(index_dir, "asc_bm25.npz"))
+        with open(os.path.join(index_dir, "asc_bm25.json"), "r") as f:
+            data = json.load(f)
+        return cls(weights, data["vocabulary"], data["occupations"], data.get("kb_version"))
+
+    def search(self, query, top_k=5):
+        """
+        Return the top_k occupations for a query.
+
+        Returns:
+            list: Dicts with anzsco_code, title, text and score, best first
+        """
+        terms = [self.vocabulary[token] for token in tokenize(query) if token in self.vocabulary]
+        if not terms:
+            return []
+
+        # Only the query's columns take part in the product
+        term_ids, term_counts = np.unique(terms, return_counts=True)
+        scores = self.weights[:, term_ids] @ term_counts.astype(np.float32)
+
+        top_k = min(top_k, int(np.count_nonzero(scores)))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [dict(self.occupations[i], score=float(scores[i])) for i in top]
+
+
+def _load_index(kb_version):
+    index = None
+    if os.path.exists(os.path.join(ASC_INDEX_DIR, "asc_bm25.npz")):
+        index = ASCIndex.load()
+        if kb_version != "none" and index.kb_version != kb_version:
+            print("Prebuilt ASC index is out of date. Rebuilding from the knowledge base...")
+            index = None
+    else:
+        print("No prebuilt ASC index found. Building from the knowledge base...")
+    if not index:
+        index = ASCIndex.build()
+        index.save()
+    return index
+
+
+_index = KBSingleton(_load_index)
+
+
+def get_asc_index():
+    """
+    Return the process-wide ASC index, loading it from disk on first use.
+
+    If no prebuilt index exists, or it was built from a different version of the
+    knowledge base JSON, it is rebuilt and saved. A prebuilt index is used as is
+    when the JSON itself is not deployed.
+    """
+    return _index.get()
+
+
+def format_search_results(results):
+    """Format search results for an agent."""
+    if not results:
+        return "No matching occupations found in the ASC knowledge base."
+    return "\n\n".join(
+        f"Result {rank} (relevance {result['score']:.2f}):\n{result['text']}"
+        for rank, result in enumerate(results, start=1)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the local ASC retrieval index.")
+    parser.add_argument("query", nargs="?", help="Query to run against the index (builds the index if omitted)")
+    parser.add_argument("--json-path", default=ASC_KB_JSON_PATH, help="Knowledge base JSON")
+    parser.add_argument("--top-k", type=int, default=5, help="Number of results")
+    args = parser.parse_args()
+
+    if not args.query:
+        start = time.perf_counter()
+        index = ASCIndex.build(args.json_path)
+        index.save()
+        print(f"Indexed {len(index.occupations)} occupations, {len(index.vocabulary)} terms "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+
+    index = get_asc_index()
+    start = time.perf_counter()
+    results = index.search(args.query, args.top_k)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for result in results:
+        print(f"{result['score']:7.2f}  {result['anzsco_code']}  {result['title']}")
+    print(f"{len(results)} results in {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
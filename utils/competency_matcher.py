@@ -0,0 +1,126 @@
+# utils/competency_matcher.py
+from functools import lru_cache
+
+import numpy as np
+
+from utils.asc_data import ASC_KB_JSON_PATH, KBSingleton, get_asc_core_competencies, iter_asc_entries
+
+# Highest rating on the core competencies sliders
+USER_RATING_SCALE = 10
+# Highest core competency score in the ASC
+ASC_SCORE_SCALE = 10
+
+
+class CompetencyMatcher:
+    """
+    Nearest-neighbour search of ASC occupations by core competency profile.
+
+    Occupation competency scores are held in a dense occupation x competency matrix
+    (NaN where an occupation has no score) scaled from the ASC score range to
+    [0, 1], like the user's ratings.
+    A query is one vectorised weighted distance over the whole matrix.
+    """
+
+    def __init__(self, matrix, competencies, occupations, cache_size=1024):
+        self.matrix = matrix
+        self.competencies = competencies
+        self.occupations = occupations
+        self._cached_nearest = lru_cache(maxsize=cache_size)(self._nearest)
+
+    @classmethod
+    def build(cls, json_path=ASC_KB_JSON_PATH):
+        """Build the occupation x competency matrix from the knowledge base JSON."""
+        competencies = list(get_asc_core_competencies())
+        columns = {name.lower(): i for i, name in enumerate(competencies)}
+        occupations = []
+        rows = []
+
+        for entry in iter_asc_entries(json_path):
+            metadata = entry.get("metadata", {})
+            occupations.append({
+                "anzsco_code": metadata.get("anzsco_code", "Unknown"),
+                "title": metadata.get("title", "Unknown Title"),
+            })
+            row = np.full(len(competencies), np.nan, dtype=np.float32)
+            for comp in metadata.get("core_competencies", []):
+                column = columns.get(str(comp.get("name", "")).lower())
+                if column is None:
+                    continue
+                try:
+                    row[column] = float(comp.get("score"))
+                except (TypeError, ValueError):
+                    continue
+            rows.append(row)
+
+        matrix = np.vstack(rows) if rows else np.empty((0, len(competencies)), dtype=np.float32)
+        # Scaled by the fixed ASC range, so one outlying score cannot shift every occupation
+        matrix = np.clip(matrix / ASC_SCORE_SCALE, 0.0, 1.0)
+
+        return cls(matrix, competencies, occupations)
+
+    def rating_vector(self, ratings):
+        """Turn a {competency name: rating} dict into a tuple in matrix column order."""
+        return tuple(float(ratings.get(name, 0) or 0) for name in self.competencies)
+
+    def _nearest(self, ratings, top_k, weights):
+        user = np.asarray(ratings, dtype=np.float32) / USER_RATING_SCALE
+        weights = np.asarray(weights, dtype=np.float32) if weights else np.ones(len(user), dtype=np.float32)
+
+        # 0 means "not applicable", so those competencies do not count
+        rated = (user > 0).astype(np.float32) * weights
+        if not rated.any() or not len(self.occupations):
+            return ()
+
+        present = ~np.isnan(self.matrix)
+        diff = np.where(present, self.matrix - user, 0.0)
+        mask = present * rated
+        total_weight = mask.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            distances = np.sqrt((mask * diff ** 2).sum(axis=1) / total_weight)
+        distances[total_weight == 0] = np.inf
+
+        top_k = min(top_k, int(np.isfinite(distances).sum()))
+        if top_k <= 0:
+            return ()
+        top = np.argpartition(distances, top_k - 1)[:top_k]
+        top = top[np.argsort(distances[top])]
+        return tuple((int(i), float(distances[i])) for i in top)
+
+    def nearest(self, ratings, top_k=10, weights=None):
+        """
+        Return the occupations whose competency profile is closest to the user's ratings.
+
+        Results are cached per rating vector.
+
+        Args:
+            ratings: {competency name: rating} as returned by get_user_competencies
+            top_k: Number of occupations to return
+            weights: Optional {competency name: weight}; competencies default to weight 1
+
+        Returns:
+            list: Dicts with anzsco_code, title and distance (0 is an exact match), closest first
+        """
+        weight_vector = tuple(float(weights.get(name, 1)) for name in self.competencies) if weights else None
+        results = self._cached_nearest(self.rating_vector(ratings), top_k, weight_vector)
+        return [dict(self.occupations[i], distance=distance) for i, distance in results]
+
+    def cache_info(self):
+        return self._cached_nearest.cache_info()
+
+
+_matcher = KBSingleton(lambda kb_version: CompetencyMatcher.build())
+
+
+def get_competency_matcher():
+    """Return the process-wide CompetencyMatcher, rebuilding it when the knowledge base changes."""
+    return _matcher.get()
+
+
+def format_competency_matches(matches):
+    """Format competency matches for an agent."""
+    if not matches:
+        return "No ASC occupations could be compared with the user's competency ratings."
+    lines = ["Occupations with the closest core competency profile (distance, 0 = identical):"]
+    for rank, match in enumerate(matches, start=1):
+        lines.append(f"{rank}. {match['title']} (ANZSCO: {match['anzsco_code']}) - {match['distance']:.3f}")
+    return "\n".join(lines)
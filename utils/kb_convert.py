@@ -0,0 +1,224 @@
+# utils/kb_convert.py
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+
+from utils.asc_data import ASC_KB_JSON_PATH, get_asc_core_competencies, iter_asc_entries
+from utils.kb_sync import KB_TEXT_DIR
+
+# Entries rendered per process pool task
+CONVERT_CHUNK_SIZE = 500
+
+
+def occupation_filename(entry):
+    """Return the text file name for a knowledge base entry."""
+    metadata = entry.get("metadata", {})
+    anzsco_code = metadata.get("anzsco_code", "Unknown")
+    safe_title = re.sub(r'[\\/:"*?<>|]+', '_', metadata.get("title", "Unknown Title"))
+    return f"{safe_title}_{anzsco_code}.txt"
+
+
+def render_occupation(entry):
+    """Render a knowledge base entry as the occupation text uploaded to the vector store."""
+    metadata = entry.get("metadata", {})
+    anzsco_code = metadata.get("anzsco_code", "Unknown")
+    title = metadata.get("title", "Unknown Title")
+    description = metadata.get("description", "")
+
+    competencies = metadata.get("core_competencies", [])
+    comp_text = [
+        f"{comp.get('name', '')}: {comp.get('level', '')} (score: {comp.get('score', '')})"
+        for comp in competencies if comp.get("name", "")
+    ]
+
+    tasks = metadata.get("specialist_tasks", [])
+    tools = metadata.get("technology_tools", [])
+
+    return f"""
+# {title} (ANZSCO: {anzsco_code})
+
+## Description
+{description}
+
+## Required Core Competencies
+{', '.join(comp_text)}
+
+## Specialized Tasks
+{', '.join(tasks)}
+
+## Technology Tools
+{', '.join(tools)}
+"""
+
+
+def write_if_changed(path, text):
+    """
+    Atomically write text to path unless the file already holds the same content.
+
+    Returns:
+        bool: True if the file was written
+    """
+    data = text.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if hashlib.sha256(f.read()).digest() == hashlib.sha256(data).digest():
+                return False
+    except OSError:
+        pass
+
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return True
+
+
+def _convert_chunk(entries, out_dir):
+    """Render and write a chunk of entries. Runs in a worker process."""
+    filenames = []
+    written = 0
+    for entry in entries:
+        filename = occupation_filename(entry)
+        if write_if_changed(os.path.join(out_dir, filename), render_occupation(entry)):
+            written += 1
+        filenames.append(filename)
+    return filenames, written
+
+
+def convert_knowledge_base(json_path=ASC_KB_JSON_PATH, out_dir=KB_TEXT_DIR, workers=None,
+                           chunk_size=CONVERT_CHUNK_SIZE):
+    """
+    Convert the JSON knowledge base into one text file per occupation.
+
+    Entries are parsed incrementally and rendered in a process pool, with a bounded
+    number of chunks in flight so memory stays flat for large datasets. Files whose
+    rendered content has not changed are left untouched, and text files of
+    occupations no longer in the knowledge base are removed.
+
+    Args:
+        json_path: Path to the knowledge base JSON
+        out_dir: Directory for the occupation text files
+        workers: Process pool size (defaults to the CPU count); 1 converts in this
+                 process, which is what the app uses so it never forks a pool
+        chunk_size: Entries per process pool task
+
+    Returns:
+        dict: Counts of "written", "unchanged" and "removed" files
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    counts = {"written": 0, "unchanged": 0, "removed": 0}
+    produced = set()
+
+    def record(filenames, written):
+        produced.update(filenames)
+        counts["written"] += written
+        counts["unchanged"] += len(filenames) - written
+
+    entries = iter_asc_entries(json_path)
+    if workers == 1:
+        while True:
+            chunk = list(islice(entries, chunk_size))
+            if not chunk:
+                break
+            record(*_convert_chunk(chunk, out_dir))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight = set()
+            while True:
+                chunk = list(islice(entries, chunk_size))
+                if not chunk:
+                    break
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(*future.result())
+                in_flight.add(pool.submit(_convert_chunk, chunk, out_dir))
+            for future in wait(in_flight).done:
+                record(*future.result())
+
+    # Remove text files of occupations dropped from the knowledge base
+    for filename in os.listdir(out_dir):
+        if filename.endswith(".txt") and filename not in produced:
+            os.remove(os.path.join(out_dir, filename))
+            counts["removed"] += 1
+
+    return counts
+
+
+def _write_synthetic_kb(path, count):
+    """Write a synthetic knowledge base with count occupations, for benchmarking."""
+    competencies = list(get_asc_core_competencies())
+    levels = ["Basic", "Intermediate", "High", "Very high"]
+    words = ["analyse", "design", "maintain", "install", "coordinate", "inspect", "report",
+             "develop", "test", "operate", "manage", "evaluate", "systems", "equipment",
+             "records", "clients", "software", "networks", "machinery", "budgets"]
+    rng = random.Random(0)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(count):
+            entry = {"metadata": {
+                "anzsco_code": f"{100000 + i}",
+                "title": f"Synthetic Occupation {i}",
+                "description": " ".join(rng.choices(words, k=40)),
+                "core_competencies": [
+                    {"name": name, "level": rng.choice(levels), "score": round(rng.uniform(1, 10), 1)}
+                    for name in competencies
+                ],
+                "specialist_tasks": [" ".join(rng.choices(words, k=6)) for _ in range(rng.randint(5, 30))],
+                "technology_tools": [f"Tool {rng.randint(0, 5000)}" for _ in range(rng.randint(0, 15))]
+            }}
+            f.write(("," if i else "") + json.dumps(entry))
+        f.write("]")
+
+
+def run_benchmark(count, workers=None):
+    """Time a cold and a warm conversion of a synthetic knowledge base."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, "asc_knowledge_base.json")
+        out_dir = os.path.join(tmp_dir, "files")
+
+        _write_synthetic_kb(json_path, count)
+        print(f"Synthetic knowledge base: {count} occupations, {os.path.getsize(json_path) / 2**20:.1f} MiB")
+
+        for label in ("cold", "warm"):
+            start = time.perf_counter()
+            counts = convert_knowledge_base(json_path, out_dir, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {elapsed:.2f}s ({count / elapsed:.0f} entries/s), "
+                  f"{counts['written']} written, {counts['unchanged']} unchanged")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert the ASC knowledge base JSON into occupation text files.")
+    parser.add_argument("json_path", nargs="?", default=ASC_KB_JSON_PATH, help="Knowledge base JSON")
+    parser.add_argument("--out", default=KB_TEXT_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, help="Process pool size")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Benchmark on a synthetic knowledge base of N occupations instead")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, workers=args.workers)
+        return
+
+    start = time.perf_counter()
+    counts = convert_knowledge_base(args.json_path, args.out, workers=args.workers)
+    print(f"Converted in {time.perf_counter() - start:.2f}s: "
+          f"{counts['written']} written, {counts['unchanged']} unchanged, {counts['removed']} removed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# utils/kb_shards.py
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from openai import AsyncOpenAI
+
+from utils.asc_data import ASC_KB_JSON_PATH, iter_asc_entries
+from utils.kb_convert import convert_knowledge_base, render_occupation, write_if_changed
+from utils.kb_sync import file_digest, remote_filename
+from utils.kb_upload import upload_files
+
+KB_SHARD_DIR = "data/shards"
+# Target size of a packed shard
+KB_SHARD_BYTES = int(os.environ.get("ASC_KB_SHARD_BYTES", 256 * 1024))
+# "occupation" uploads one file per occupation, "packed" uploads size-targeted shards
+KB_LAYOUT = os.environ.get("ASC_KB_LAYOUT", "occupation")
+
+SECTION_DELIMITER = "\n\n=============================="
+
+REPORT_QUERIES = [
+    "software developer programming skills",
+    "registered nurse patient care",
+    "electrician install wiring",
+    "accountant financial reports",
+    "data analyst statistics",
+    "chef food preparation",
+    "civil engineer construction projects",
+    "teacher lesson planning",
+]
+
+
+def render_section(entry):
+    """Render an occupation as a delimited, ANZSCO-anchored section of a shard."""
+    anzsco_code = entry.get("metadata", {}).get("anzsco_code", "Unknown")
+    return f"{SECTION_DELIMITER}\nANZSCO: {anzsco_code}{render_occupation(entry)}"
+
+
+def pack_shards(json_path=ASC_KB_JSON_PATH, out_dir=KB_SHARD_DIR, target_bytes=KB_SHARD_BYTES):
+    """
+    Pack occupation records into shards of roughly target_bytes each.
+
+    Occupations keep the knowledge base order and shards are filled greedily, so
+    an edit that leaves an occupation's size unchanged only rewrites its own shard.
+    An edit that changes its size can move a boundary, and the shift then cascades
+    through every later shard. Shards whose content ends up the same are not
+    rewritten.
+
+    Args:
+        json_path: Path to the knowledge base JSON
+        out_dir: Directory for the shard files
+        target_bytes: Size at which a shard is closed
+
+    Returns:
+        dict: Counts of "shards", "written" and "occupations"
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {"shards": 0, "written": 0, "occupations": 0}
+    sections = []
+    size = 0
+
+    def flush():
+        counts["shards"] += 1
+        path = os.path.join(out_dir, f"asc_shard_{counts['shards']:04d}.txt")
+        if write_if_changed(path, "".join(sections).lstrip("\n")):
+            counts["written"] += 1
+
+    for entry in iter_asc_entries(json_path):
+        section = render_section(entry)
+        section_size = len(section.encode("utf-8"))
+        if sections and size + section_size > target_bytes:
+            flush()
+            sections, size = [], 0
+        sections.append(section)
+        size += section_size
+        counts["occupations"] += 1
+
+    if sections:
+        flush()
+
+    # Remove shards left over from a previous, larger packing
+    expected = {f"asc_shard_{i:04d}.txt" for i in range(1, counts["shards"] + 1)}
+    for filename in os.listdir(out_dir):
+        if filename.startswith("asc_shard_") and filename not in expected:
+            os.remove(os.path.join(out_dir, filename))
+
+    return counts
+
+
+def _layout_files(directory):
+    paths = [os.path.join(directory, f) for f in sorted(os.listdir(directory))]
+    return [(path, remote_filename(os.path.basename(path), file_digest(path))) for path in paths if os.path.isfile(path)]
+
+
+async def _measure_layout(client, label, directory, queries):
+    """Upload a layout to a scratch vector store and time uploads and searches."""
+    files = _layout_files(directory)
+    vector_store = await client.vector_stores.create(name=f"ASC layout report ({label})")
+    try:
+        start = time.perf_counter()
+        _, stats = await upload_files(client, vector_store.id, files)
+        upload_seconds = time.perf_counter() - start
+
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            await client.vector_stores.search(vector_store_id=vector_store.id, query=query, max_num_results=5)
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        await client.vector_stores.delete(vector_store.id)
+
+    return {
+        "files": len(files),
+        "bytes": sum(os.path.getsize(path) for path, _ in files),
+        "upload_seconds": upload_seconds,
+        "failed": stats.files_failed,
+        "search_ms_median": statistics.median(latencies),
+        "search_ms_max": max(latencies),
+    }
+
+
+def layout_report(json_path=ASC_KB_JSON_PATH, target_bytes=KB_SHARD_BYTES, client=None):
+    """
+    Compare the per-occupation and packed layouts.
+
+    Without a client only file counts and sizes are reported. With a client, each
+    layout is uploaded to a scratch vector store to time the upload and the search
+    latency of a fixed set of queries. Both layouts are written to temporary
+    directories, so the files the app syncs are left alone.
+
+    Returns:
+        dict: {layout: metrics}
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        layouts = {"occupation": os.path.join(tmp_dir, "files"), "packed": os.path.join(tmp_dir, "shards")}
+        convert_knowledge_base(json_path, layouts["occupation"])
+        pack_shards(json_path, layouts["packed"], target_bytes)
+
+        if not client:
+            report = {}
+            for label, directory in layouts.items():
+                files = _layout_files(directory)
+                report[label] = {"files": len(files), "bytes": sum(os.path.getsize(path) for path, _ in files)}
+            return report
+
+        async def measure_all():
+            return {
+                label: await _measure_layout(client, label, directory, REPORT_QUERIES)
+                for label, directory in layouts.items()
+            }
+
+        return asyncio.run(measure_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack ASC occupations into size-targeted shards.")
+    parser.add_argument("json_path", nargs="?", default=ASC_KB_JSON_PATH, help="Knowledge base JSON")
+    parser.add_argument("--out", default=KB_SHARD_DIR, help="Output directory")
+    parser.add_argument("--shard-bytes", type=int, default=KB_SHARD_BYTES, help="Target bytes per shard")
+    parser.add_argument("--report", action="store_true", help="Compare per-occupation and packed layouts")
+    parser.add_argument("--upload", action="store_true",
+                        help="With --report, time uploads and searches against scratch vector stores")
+    parser.add_argument("--base-url", help="API base URL, e.g. a local stand-in server")
+    args = parser.parse_args()
+
+    if not args.report:
+        counts = pack_shards(args.json_path, args.out, args.shard_bytes)
+        print(f"Packed {counts['occupations']} occupations into {counts['shards']} shards ({counts['written']} written)")
+        return
+
+    client = None
+    if args.upload:
+        api_key = os.environ.get("OPENAI_API_KEY") or ("local" if args.base_url else None)
+        if not api_key:
+            parser.error("OPENAI_API_KEY must be set unless --base-url is given")
+        client = AsyncOpenAI(api_key=api_key, base_url=args.base_url, max_retries=0)
+
+    for label, metrics in layout_report(args.json_path, args.shard_bytes, client).items():
+        print(f"{label:>10}: " + ", ".join(
+            f"{name}={value:.1f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in metrics.items()
+        ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+# utils/kb_sync.py
+import asyncio
+import hashlib
+import json
+import os
+
+from openai import AsyncOpenAI
+
+from utils.kb_upload import upload_files
+
+KB_VECTOR_STORE_NAME = "ASC Knowledge Base"
+KB_TEXT_DIR = "data/files"
+KB_MANIFEST_PATH = "data/kb_manifest.json"
+
+
+def file_digest(path):
+    """Return the content hash used to identify a knowledge base file."""
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            sha.update(chunk)
+    return sha.hexdigest()[:16]
+
+
+def remote_filename(filename, digest):
+    """Name under which a local file is uploaded, so the remote copy carries its content hash."""
+    return f"{digest}_{filename}"
+
+
+def parse_remote_filename(remote_name):
+    """
+    Split a remote filename produced by remote_filename.
+
+    Returns:
+        tuple: (filename, digest), or None if the file was not uploaded by the sync engine
+    """
+    digest, sep, filename = remote_name.partition("_")
+    if not sep or len(digest) != 16 or any(c not in "0123456789abcdef" for c in digest):
+        return None
+    return filename, digest
+
+
+def load_manifest(manifest_path=KB_MANIFEST_PATH):
+    """Load the local manifest, or an empty one if it does not exist or is unreadable."""
+    try:
+        with open(manifest_path, "r") as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("files"), dict):
+            return manifest
+    except (OSError, ValueError, AttributeError):
+        pass
+    return {"vector_store_id": None, "files": {}}
+
+
+def save_manifest(manifest, manifest_path=KB_MANIFEST_PATH):
+    """Atomically write the manifest to disk."""
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def scan_local_files(text_dir=KB_TEXT_DIR):
+    """Return {filename: digest} for every knowledge base file in text_dir."""
+    if not os.path.isdir(text_dir):
+        return {}
+    return {
+        filename: file_digest(os.path.join(text_dir, filename))
+        for filename in sorted(os.listdir(text_dir))
+        if os.path.isfile(os.path.join(text_dir, filename))
+    }
+
+
+def find_or_create_vector_store(client, vector_store_id=None):
+    """Return the ASC vector store, preferring the id recorded in the manifest."""
+    if vector_store_id:
+        try:
+            return client.vector_stores.retrieve(vector_store_id)
+        except Exception as e:
+            print(f"Vector store {vector_store_id} from manifest not available: {e}")
+
+    for vs in client.vector_stores.list():
+        if vs.name == KB_VECTOR_STORE_NAME:
+            print(f"{KB_VECTOR_STORE_NAME} vector store found: {vs.id}")
+            return vs
+
+    vector_store = client.vector_stores.create(name=KB_VECTOR_STORE_NAME)
+    print(f"Created vector store {KB_VECTOR_STORE_NAME} with ID: {vector_store.id}")
+    return vector_store
+
+
+def list_remote_file_ids(client, vector_store_id):
+    """
+    Return the ids of the files attached to the vector store.
+
+    Returns:
+        tuple: (ids of usable files, ids of files that failed indexing)
+    """
+    usable, failed = set(), set()
+    for f in client.vector_stores.files.list(vector_store_id=vector_store_id, limit=100):
+        (failed if f.status == "failed" else usable).add(f.id)
+    return usable, failed
+
+
+def _recover_remote_entries(client, file_ids):
+    """Rebuild manifest entries for remote files from their content-addressed filenames."""
+    entries = {}
+    for f in client.files.list(purpose="assistants"):
+        if f.id not in file_ids:
+            continue
+        parsed = parse_remote_filename(f.filename or "")
+        if parsed:
+            filename, digest = parsed
+            entries[filename] = {"digest": digest, "file_id": f.id}
+    return entries
+
+
+def diff_knowledge_base(local_files, known_files, remote_file_ids):
+    """
+    Compare local files with what the vector store holds.
+
+    Args:
+        local_files: {filename: digest} of the local knowledge base
+        known_files: {filename: {"digest", "file_id"}} of files known to be remote
+        remote_file_ids: ids of the files currently attached to the vector store
+
+    Returns:
+        tuple: (filenames to upload, remote file ids to delete, up-to-date manifest entries)
+    """
+    current = {
+        filename: known_files[filename]
+        for filename, digest in local_files.items()
+        if filename in known_files
+        and known_files[filename]["digest"] == digest
+        and known_files[filename]["file_id"] in remote_file_ids
+    }
+    to_upload = [filename for filename in local_files if filename not in current]
+    keep_ids = {entry["file_id"] for entry in current.values()}
+    to_delete = sorted(remote_file_ids - keep_ids)
+    return to_upload, to_delete, current
+
+
+def retained_entries(filenames, current, known_files, remote_file_ids):
+    """
+    Previous manifest entries of files that were to be uploaded but are not current.
+
+    Their digests are stale, so the next sync uploads them again, but their remote
+    copies are kept and not deleted while no replacement exists.
+    """
+    return {
+        filename: known_files[filename]
+        for filename in filenames
+        if filename not in current
+        and filename in known_files
+        and known_files[filename]["file_id"] in remote_file_ids
+    }
+
+
+def _upload_files(client, vector_store_id, text_dir, local_files, filenames):
+    """Upload files and attach them to the vector store. Returns their manifest entries."""
+    upload_names = {remote_filename(filename, local_files[filename]): filename for filename in filenames}
+    files = [(os.path.join(text_dir, filename), upload_name) for upload_name, filename in upload_names.items()]
+
+    async_client = AsyncOpenAI(api_key=client.api_key, base_url=client.base_url, max_retries=0)
+    results, stats = asyncio.run(upload_files(async_client, vector_store_id, files))
+    print(stats.summary())
+
+    return {
+        upload_names[upload_name]: {"digest": local_files[upload_names[upload_name]], "file_id": file_id}
+        for upload_name, file_id in results.items()
+    }
+
+
+def _delete_files(client, vector_store_id, file_ids):
+    """Detach stale files from the vector store and delete them."""
+    for file_id in file_ids:
+        try:
+            client.vector_stores.files.delete(file_id=file_id, vector_store_id=vector_store_id)
+            client.files.delete(file_id)
+        except Exception as e:
+            print(f"Failed to delete stale file {file_id}: {e}")
+
+
+def sync_knowledge_base(client, text_dir=KB_TEXT_DIR, manifest_path=KB_MANIFEST_PATH):
+    """
+    Bring the ASC vector store in line with the local knowledge base files.
+
+    Each local file is identified by its content hash. Only files that are new or
+    changed since the last sync are uploaded, and remote files that no longer match
+    a local file are deleted, so an unchanged knowledge base costs no uploads. The
+    old copy of a changed file is only deleted once its new version is attached.
+    The manifest is a local cache: if it is missing (e.g. a fresh container), it is
+    rebuilt from the hashes embedded in the remote filenames.
+
+    Args:
+        client: OpenAI client
+        text_dir: Directory holding the occupation text files
+        manifest_path: Path of the local manifest
+
+    Returns:
+        VectorStore: The synced vector store
+    """
+    local_files = scan_local_files(text_dir)
+    manifest = load_manifest(manifest_path)
+
+    vector_store = find_or_create_vector_store(client, manifest.get("vector_store_id"))
+    if manifest.get("vector_store_id") != vector_store.id:
+        manifest = {"vector_store_id": vector_store.id, "files": {}}
+
+    remote_file_ids, failed_file_ids = list_remote_file_ids(client, vector_store.id)
+    known_files = dict(manifest["files"])
+    tracked_ids = {entry["file_id"] for entry in known_files.values()}
+    if remote_file_ids - tracked_ids:
+        known_files.update(_recover_remote_entries(client, remote_file_ids - tracked_ids))
+
+    to_upload, to_delete, current = diff_knowledge_base(local_files, known_files, remote_file_ids)
+    # Failed files are never current, and are deleted like any other stale file
+    to_delete = sorted(set(to_delete) | failed_file_ids)
+    print(f"Knowledge base sync: {len(current)} up to date, {len(to_upload)} to upload, {len(to_delete)} to delete")
+
+    if to_upload:
+        current.update(_upload_files(client, vector_store.id, text_dir, local_files, to_upload))
+        # A file whose new version failed to upload keeps its old remote copy until a later sync replaces it
+        current.update(retained_entries(to_upload, current, known_files, remote_file_ids))
+        to_delete = sorted((remote_file_ids | failed_file_ids) - {entry["file_id"] for entry in current.values()})
+
+    if to_delete:
+        _delete_files(client, vector_store.id, to_delete)
+
+    save_manifest({"vector_store_id": vector_store.id, "files": current}, manifest_path)
+    return vector_store
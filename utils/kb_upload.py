@@ -0,0 +1,216 @@
+# utils/kb_upload.py
+import argparse
+import asyncio
+import os
+import time
+
+from openai import AsyncOpenAI, NotFoundError
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from utils.agents.client_pool import is_retryable
+
+# Concurrent file uploads
+UPLOAD_WORKERS = 8
+# Files attached to the vector store per file batch
+UPLOAD_BATCH_SIZE = 500
+# Attempts per upload / batch before giving up
+UPLOAD_MAX_RETRIES = 5
+
+
+class UploadStats:
+    """Throughput counters for a bulk upload."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.finished = None
+        self.files_uploaded = 0
+        self.bytes_uploaded = 0
+        self.files_attached = 0
+        self.files_failed = 0
+        self.batches = 0
+
+    @property
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    @property
+    def files_per_second(self):
+        return self.files_uploaded / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self):
+        return self.bytes_uploaded / self.elapsed if self.elapsed else 0.0
+
+    def summary(self):
+        return (
+            f"Uploaded {self.files_uploaded} files ({self.bytes_uploaded / 1024:.1f} KiB), "
+            f"attached {self.files_attached} in {self.batches} batch(es), {self.files_failed} failed, "
+            f"in {self.elapsed:.1f}s: {self.files_per_second:.1f} files/s, "
+            f"{self.bytes_per_second / 1024:.1f} KiB/s"
+        )
+
+
+async def _with_retries(fn, max_retries):
+    """Await fn() with jittered exponential backoff on transient errors."""
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(max_retries),
+        wait=wait_random_exponential(multiplier=0.5, max=30),
+        retry=retry_if_exception(is_retryable),
+        reraise=True
+    ):
+        with attempt:
+            return await fn()
+
+
+async def upload_files(client, vector_store_id, files, max_workers=UPLOAD_WORKERS,
+                       batch_size=UPLOAD_BATCH_SIZE, max_retries=UPLOAD_MAX_RETRIES):
+    """
+    Upload files concurrently and attach them to a vector store in large batches.
+
+    Uploads run through a bounded worker pool. As soon as batch_size files are
+    uploaded they are attached with one file batch, which is polled in the
+    background while the remaining uploads continue. Files that fail indexing are
+    re-attached with backoff; files still failed after the last attempt, or in a
+    batch that could not be created, are detached and deleted so none are left
+    behind.
+
+    Args:
+        client: AsyncOpenAI client
+        vector_store_id: Target vector store
+        files: List of (path, upload_name) tuples
+        max_workers: Maximum concurrent uploads
+        batch_size: Files per file batch
+        max_retries: Attempts per upload or batch
+
+    Returns:
+        tuple: ({upload_name: file_id} for attached files, UploadStats)
+    """
+    stats = UploadStats()
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def upload_one(path, upload_name):
+        async with semaphore:
+            with open(path, "rb") as f:
+                content = f.read()
+            uploaded = await _with_retries(
+                lambda: client.files.create(file=(upload_name, content), purpose="assistants"),
+                max_retries
+            )
+            return upload_name, uploaded.id, len(content)
+
+    async def discard(file_id):
+        """Detach a file that could not be indexed from the vector store and delete it."""
+        async with semaphore:
+            try:
+                await client.vector_stores.files.delete(file_id=file_id, vector_store_id=vector_store_id)
+            except NotFoundError:
+                pass  # Never attached
+            except Exception as e:
+                print(f"Failed to detach file {file_id}: {e}")
+            try:
+                await client.files.delete(file_id)
+            except Exception as e:
+                print(f"Failed to delete file {file_id}: {e}")
+
+    async def attach_batch(entries):
+        stats.batches += 1
+        attached = {}
+        remaining = dict(entries)
+        try:
+            for attempt in range(max_retries):
+                file_batch = await _with_retries(
+                    lambda: client.vector_stores.file_batches.create_and_poll(
+                        vector_store_id=vector_store_id,
+                        file_ids=list(remaining.values())
+                    ),
+                    max_retries
+                )
+                failed_ids = set()
+                if file_batch.file_counts.failed:
+                    async for f in client.vector_stores.file_batches.list_files(
+                            batch_id=file_batch.id, vector_store_id=vector_store_id, filter="failed"):
+                        failed_ids.add(f.id)
+
+                for upload_name, file_id in list(remaining.items()):
+                    if file_id not in failed_ids:
+                        attached[upload_name] = remaining.pop(upload_name)
+
+                if not remaining or attempt == max_retries - 1:
+                    break
+                print(f"{len(remaining)} file(s) failed indexing in batch {file_batch.id}, retrying...")
+                await asyncio.sleep(min(30, 2 ** attempt))
+        except Exception as e:
+            print(f"File batch failed: {e}")
+
+        if remaining:
+            print(f"Discarding {len(remaining)} file(s) that could not be attached")
+            await asyncio.gather(*(discard(file_id) for file_id in remaining.values()))
+        stats.files_attached += len(attached)
+        stats.files_failed += len(remaining)
+        return attached
+
+    pending = {}
+    batch_tasks = []
+    for next_upload in asyncio.as_completed([upload_one(path, name) for path, name in files]):
+        try:
+            upload_name, file_id, size = await next_upload
+        except Exception as e:
+            print(f"File upload failed: {e}")
+            stats.files_failed += 1
+            continue
+
+        stats.files_uploaded += 1
+        stats.bytes_uploaded += size
+        pending[upload_name] = file_id
+        if len(pending) >= batch_size:
+            batch_tasks.append(asyncio.create_task(attach_batch(pending)))
+            pending = {}
+
+    if pending:
+        batch_tasks.append(asyncio.create_task(attach_batch(pending)))
+
+    results = {}
+    for task in batch_tasks:
+        results.update(await task)
+
+    stats.finished = time.perf_counter()
+    return results, stats
+
+
+def main():
+    """Upload a directory of knowledge base files to a vector store."""
+    from utils.kb_sync import KB_TEXT_DIR, KB_VECTOR_STORE_NAME, file_digest, remote_filename
+
+    parser = argparse.ArgumentParser(description="Bulk upload ASC knowledge base files to a vector store.")
+    parser.add_argument("directory", nargs="?", default=KB_TEXT_DIR, help="Directory of files to upload")
+    parser.add_argument("--vector-store-id", help="Target vector store (a new one is created if omitted)")
+    parser.add_argument("--base-url", help="API base URL, e.g. a local stand-in server")
+    parser.add_argument("--workers", type=int, default=UPLOAD_WORKERS, help="Concurrent uploads")
+    parser.add_argument("--batch-size", type=int, default=UPLOAD_BATCH_SIZE, help="Files per file batch")
+    parser.add_argument("--retries", type=int, default=UPLOAD_MAX_RETRIES, help="Attempts per upload or batch")
+    args = parser.parse_args()
+
+    api_key = os.environ.get("OPENAI_API_KEY") or ("local" if args.base_url else None)
+    if not api_key:
+        parser.error("OPENAI_API_KEY must be set unless --base-url is given")
+
+    files = []
+    for filename in sorted(os.listdir(args.directory)):
+        path = os.path.join(args.directory, filename)
+        if os.path.isfile(path):
+            files.append((path, remote_filename(filename, file_digest(path))))
+
+    async def run():
+        client = AsyncOpenAI(api_key=api_key, base_url=args.base_url, max_retries=0)
+        vector_store_id = args.vector_store_id
+        if not vector_store_id:
+            vector_store_id = (await client.vector_stores.create(name=KB_VECTOR_STORE_NAME)).id
+            print(f"Created vector store with ID: {vector_store_id}")
+        return await upload_files(client, vector_store_id, files, args.workers, args.batch_size, args.retries)
+
+    _, stats = asyncio.run(run())
+    print(stats.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 # utils/llm_service.py
 import os
 import streamlit as st
-from utils.agents.agent_manager import AgentManager
+from utils.agents.agent_manager import UserContext
+from utils.agents.registry import get_agent_manager
 
 
 def generate_response(supabase, user, user_query):
@@ -17,20 +18,45 @@ def generate_response(supabase, user, user_query):
         return "Please provide an OpenAI API key in the sidebar to use advanced features."
 
     try:
-        if "agent_manager" not in st.session_state:
-            st.session_state.agent_manager = AgentManager(api_key=api_key, supabase=supabase, user=user)
+        agent_manager = get_agent_manager(api_key)
+        if not agent_manager:
+            return "Failed to initialize the agent system. Please check your API key and try again."
 
-        agent_manager = st.session_state.agent_manager
+        context = UserContext(supabase=supabase, user=user, session_id=st.session_state.get("chat_session_id"))
 
-        if "triage_agent" not in st.session_state:
-            triage_agent = agent_manager.initialize_agents()
-            if not triage_agent:
-                return "Failed to initialize the agent system. Please check your API key and try again."
-            st.session_state.triage_agent = triage_agent
-
-        return agent_manager.process_user_query(user_query)
+        return agent_manager.process_user_query(user_query, context=context)
 
     except Exception as e:
         error_msg = str(e)
         print(f"Error in generate_response: {error_msg}")
-        return f"I encountered an issue processing your request: {error_msg}. Please try again or check your API key."
\ No newline at end of file
+        return f"I encountered an issue processing your request: {error_msg}. Please try again or check your API key."
+
+
+def stream_response(supabase, user, user_query):
+    """
+    Stream a response from the agent system.
+
+    Yields:
+        dict: Events from AgentManager.stream_user_query
+    """
+
+    api_key = st.session_state.get("openai_api_key")
+
+    if not api_key:
+        yield {"type": "error", "content": "Please provide an OpenAI API key in the sidebar to use advanced features."}
+        return
+
+    try:
+        agent_manager = get_agent_manager(api_key)
+        if not agent_manager:
+            yield {"type": "error", "content": "Failed to initialize the agent system. Please check your API key and try again."}
+            return
+
+        context = UserContext(supabase=supabase, user=user, session_id=st.session_state.get("chat_session_id"))
+
+        yield from agent_manager.stream_user_query(user_query, context=context)
+
+    except Exception as e:
+        error_msg = str(e)
+        print(f"Error in stream_response: {error_msg}")
+        yield {"type": "error", "content": f"I encountered an issue processing your request: {error_msg}. Please try again or check your API key."}
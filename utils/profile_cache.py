@@ -0,0 +1,129 @@
+# utils/profile_cache.py
+import os
+import threading
+import time
+
+# Seconds a cached user profile stays valid
+PROFILE_CACHE_TTL = float(os.environ.get("PROFILE_CACHE_TTL", 300))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+class ProfileCache:
+    """
+    Read-through TTL cache of user profiles (skills and competencies), keyed by user id.
+
+    Writes to a user's skills or competencies must call invalidate so the next
+    read fetches fresh data. A fetch only stores its result if the user was not
+    invalidated after it started, so a read racing a write cannot cache the
+    pre-write profile. A fetch that raises stores nothing.
+    """
+
+    def __init__(self, ttl=PROFILE_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        # Logical clock, advanced by every invalidate and prune
+        self._generation = 0
+        # Generation at which each user was last invalidated; users not listed count as
+        # invalidated at the last prune
+        self._invalidated = {}
+        self._pruned = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fetch_seconds = 0.0
+
+    def get(self, user_id, fetch):
+        """
+        Return the cached profile for user_id, calling fetch() on a miss.
+
+        Args:
+            user_id: Key of the profile
+            fetch: Callable returning the profile from the database
+        """
+        entry, generation = self._lookup(user_id)
+        if entry:
+            return entry[1]
+
+        start = time.perf_counter()
+        profile = fetch()
+        return self._store(user_id, profile, generation, time.perf_counter() - start)
+
+    async def aget(self, user_id, fetch):
+        """
+        Async get: return the cached profile for user_id, awaiting fetch() on a miss.
+
+        Args:
+            user_id: Key of the profile
+            fetch: Callable returning an awaitable of the profile
+        """
+        entry, generation = self._lookup(user_id)
+        if entry:
+            return entry[1]
+
+        start = time.perf_counter()
+        profile = await fetch()
+        return self._store(user_id, profile, generation, time.perf_counter() - start)
+
+    def _lookup(self, user_id):
+        """
+        Return the live (expires, profile) entry for user_id, or None, with the
+        current generation, and count the hit or miss.
+        """
+        with self._lock:
+            generation = self._generation
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry, generation
+            self.misses += 1
+            return None, generation
+
+    def _store(self, user_id, profile, generation, elapsed):
+        with self._lock:
+            self.fetch_seconds += elapsed
+            # Invalidated while fetching: the profile may predate the write
+            if self._invalidated.get(user_id, self._pruned) <= generation:
+                self._entries[user_id] = (time.monotonic() + self.ttl, profile)
+            # Drop expired entries so the cache does not grow with every user ever seen
+            if len(self._entries) > 1024:
+                now = time.monotonic()
+                self._entries = {key: value for key, value in self._entries.items() if value[0] > now}
+                self._generation += 1
+                self._pruned = self._generation
+                self._invalidated = {}
+
+        print(f"Profile fetched for user {user_id} in {elapsed * 1000:.0f} ms")
+        return profile
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._generation += 1
+            self._invalidated[user_id] = self._generation
+
+    def stats(self):
+        """Hit rate and average fetch latency."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "avg_fetch_ms": self.fetch_seconds / self.misses * 1000 if self.misses else 0.0,
+                "size": len(self._entries),
+            }
+
+
+def get_profile_cache():
+    """Return the process-wide ProfileCache."""
+    global _cache
+
+    if _cache:
+        return _cache
+
+    with _cache_lock:
+        if not _cache:
+            _cache = ProfileCache()
+        return _cache
@@ -0,0 +1,213 @@
+# utils/resume_batch.py
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.resume_extraction import build_synthetic_pdf, extract_resume_text
+from utils.skill_extractor import get_skill_extractor
+from utils.skill_matcher import get_skill_matcher
+
+RESUME_EXTENSIONS = (".pdf", ".docx")
+# Seconds between progress lines
+PROGRESS_INTERVAL = 5
+
+
+def find_resumes(input_dir):
+    """Relative paths of the PDF and DOCX files under input_dir, in a stable order."""
+    paths = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(RESUME_EXTENSIONS):
+                paths.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return paths
+
+
+def load_checkpoint(output_path):
+    """
+    Paths already processed successfully according to an output JSONL file.
+
+    A line cut short by an interrupted run is truncated away, so appending
+    continues on a clean line. Failed records are dropped from the file, so
+    their resumes are retried and each path keeps a single record.
+    """
+    if not os.path.exists(output_path):
+        return set()
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+
+    done = set()
+    kept = []
+    for line in data.splitlines(keepends=True):
+        try:
+            record = json.loads(line)
+            path = record["path"]
+        except (ValueError, KeyError):
+            continue
+        if "error" not in record:
+            done.add(path)
+            kept.append(line)
+
+    if len(kept) < len(data.splitlines()):
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(kept)
+        os.replace(tmp_path, output_path)
+    return done
+
+
+def process_resume(input_dir, path, extract_skills=True, top_k=0, include_text=False):
+    """
+    Extract the text, skills and optional ANZSCO matches of one resume. Runs in a worker process.
+
+    Returns:
+        dict: JSONL record for the resume; failures are recorded in "error"
+    """
+    start = time.perf_counter()
+    record = {"path": path}
+    try:
+        with open(os.path.join(input_dir, path), "rb") as f:
+            data = f.read()
+        record["sha256"] = hashlib.sha256(data).hexdigest()
+
+        # Pages are extracted in this worker; the batch is already spread over the pool
+        text = extract_resume_text(data, os.path.splitext(path)[1].lower(), workers=1)
+        record["characters"] = len(text)
+        if include_text:
+            record["text"] = text
+
+        if extract_skills:
+            record["skills"] = get_skill_extractor().skills(text)
+            if top_k:
+                record["matches"] = [
+                    {"anzsco_code": match["anzsco_code"], "title": match["title"], "score": round(match["score"], 4)}
+                    for match in get_skill_matcher().match(record["skills"], top_k=top_k)
+                ]
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+
+    record["seconds"] = round(time.perf_counter() - start, 4)
+    return record
+
+
+def _warm_up(top_k):
+    """
+    Load the skill extractor and matcher before the pool starts, so forked
+    workers inherit them instead of each building their own.
+
+    Returns:
+        bool: Whether skills can be extracted (the knowledge base is available)
+    """
+    try:
+        get_skill_extractor()
+        if top_k:
+            get_skill_matcher()
+        return True
+    except Exception as e:
+        print(f"Skill extraction disabled, the ASC knowledge base could not be loaded: {e}")
+        return False
+
+
+def ingest_resumes(input_dir, output_path, workers=None, top_k=0, include_text=False, restart=False):
+    """
+    Process every resume under input_dir into a JSONL file, one record per line.
+
+    Files are processed in a process pool with a bounded number in flight, and each
+    record is written as soon as it is ready. The output doubles as the checkpoint:
+    rerunning with the same output skips the resumes already processed and retries
+    the ones that failed.
+
+    Args:
+        input_dir: Directory searched recursively for PDF and DOCX files
+        output_path: JSONL file to append to
+        workers: Process pool size (defaults to the CPU count)
+        top_k: Number of ANZSCO matches per resume; 0 skips matching
+        include_text: Also write the extracted text
+        restart: Ignore and overwrite an existing output file
+
+    Returns:
+        dict: Counts of "processed", "failed" and "skipped" resumes and "elapsed" seconds
+    """
+    workers = workers or os.cpu_count() or 1
+    paths = find_resumes(input_dir)
+    done = set() if restart else load_checkpoint(output_path)
+    pending = [path for path in paths if path not in done]
+    counts = {"processed": 0, "failed": 0, "skipped": len(paths) - len(pending)}
+    print(f"{len(paths)} resumes found, {counts['skipped']} already in {output_path}, {len(pending)} to process")
+
+    extract_skills = _warm_up(top_k)
+    start = last_progress = time.perf_counter()
+
+    with open(output_path, "w" if restart else "a", encoding="utf-8") as out, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def collect(finished):
+            nonlocal last_progress
+            for future in finished:
+                record = future.result()
+                out.write(json.dumps(record) + "\n")
+                counts["failed" if "error" in record else "processed"] += 1
+            out.flush()
+
+            now = time.perf_counter()
+            if now - last_progress >= PROGRESS_INTERVAL:
+                last_progress = now
+                finished_count = counts["processed"] + counts["failed"]
+                print(f"{finished_count}/{len(pending)} resumes, {finished_count / (now - start):.1f} resumes/s")
+
+        in_flight = set()
+        for path in pending:
+            if len(in_flight) >= workers * 4:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                collect(finished)
+            in_flight.add(pool.submit(process_resume, input_dir, path, extract_skills, top_k, include_text))
+        collect(wait(in_flight).done)
+
+    counts["elapsed"] = time.perf_counter() - start
+    return counts
+
+
+def _write_synthetic_resumes(out_dir, count):
+    """Write count synthetic PDF resumes of 1-5 pages, for benchmarking."""
+    for i in range(count):
+        with open(os.path.join(out_dir, f"resume_{i:05d}.pdf"), "wb") as f:
+            f.write(build_synthetic_pdf(1 + i % 5, seed=i))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract skills and ANZSCO matches from a directory of resumes.")
+    parser.add_argument("input_dir", nargs="?", help="Directory of PDF/DOCX resumes (searched recursively)")
+    parser.add_argument("--output", default="resumes.jsonl", help="JSONL output, also used as the checkpoint")
+    parser.add_argument("--workers", type=int, help="Process pool size")
+    parser.add_argument("--top-k", type=int, default=0, help="ANZSCO matches per resume (0 to skip)")
+    parser.add_argument("--include-text", action="store_true", help="Write the extracted text too")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint and overwrite the output")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Process N synthetic resumes in a temporary directory instead")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            _write_synthetic_resumes(tmp_dir, args.benchmark)
+            counts = ingest_resumes(tmp_dir, os.path.join(tmp_dir, "resumes.jsonl"), args.workers, args.top_k)
+    elif args.input_dir:
+        counts = ingest_resumes(args.input_dir, args.output, args.workers, args.top_k,
+                                args.include_text, args.restart)
+    else:
+        parser.error("an input directory or --benchmark is required")
+
+    finished = counts["processed"] + counts["failed"]
+    print(f"Processed {counts['processed']} resumes ({counts['failed']} failed, {counts['skipped']} skipped) "
+          f"in {counts['elapsed']:.1f}s: {finished / counts['elapsed'] if counts['elapsed'] else 0:.1f} resumes/s")
+
+
+if __name__ == "__main__":
+    main()
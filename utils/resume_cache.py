@@ -0,0 +1,93 @@
+# utils/resume_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Parsed resumes kept; the least recently used are dropped beyond this
+RESUME_CACHE_SIZE = int(os.environ.get("RESUME_CACHE_SIZE", 256))
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ResumeParseCache:
+    """
+    LRU cache of parsed resumes (extracted text and skills) keyed by the SHA-256 of the file.
+
+    Streamlit reruns the script on every interaction while a file sits in the
+    uploader; with the cache each distinct file is parsed once per process, for
+    every session.
+    """
+
+    def __init__(self, max_entries=RESUME_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.parse_seconds = 0.0
+
+    def get(self, data, parse):
+        """
+        Return the parsed resume for the file contents, calling parse() on a miss.
+
+        Args:
+            data: Raw bytes of the uploaded file
+            parse: Callable returning {"text": str, "skills": list}. Results with no
+                   text are returned but not cached, so a failed parse is retried.
+        """
+        key = content_hash(data)
+
+        with self._lock:
+            parsed = self._entries.get(key)
+            if parsed:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return parsed
+            self.misses += 1
+
+        start = time.perf_counter()
+        parsed = parse()
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.parse_seconds += elapsed
+            if parsed["text"]:
+                self._entries[key] = parsed
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        print(f"Resume parsed in {elapsed * 1000:.0f} ms: {self.stats()}")
+        return parsed
+
+    def stats(self):
+        """Parses avoided (hits), parses run (misses) and average parse time."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "avg_parse_ms": self.parse_seconds / self.misses * 1000 if self.misses else 0.0,
+                "size": len(self._entries),
+            }
+
+
+def get_resume_cache():
+    """Return the process-wide ResumeParseCache."""
+    global _cache
+
+    if _cache:
+        return _cache
+
+    with _cache_lock:
+        if not _cache:
+            _cache = ResumeParseCache()
+        return _cache
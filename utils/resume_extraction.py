@@ -0,0 +1,252 @@
+# utils/resume_extraction.py
+import argparse
+import io
+import multiprocessing
+import os
+import random
+import re
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import PyPDF2
+import docx2txt
+
+# Processes extracting PDF pages
+EXTRACT_WORKERS = int(os.environ.get("RESUME_EXTRACT_WORKERS", min(4, os.cpu_count() or 1)))
+# Seconds one page may take before it is skipped
+PAGE_TIMEOUT = float(os.environ.get("RESUME_PAGE_TIMEOUT", 5))
+# Characters kept per page; anything longer is a table or embedded data dump
+MAX_PAGE_CHARS = int(os.environ.get("RESUME_MAX_PAGE_CHARS", 20000))
+# Below this many pages the process pool costs more than it saves
+MIN_PARALLEL_PAGES = 8
+
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+class PageTimeout(Exception):
+    pass
+
+
+def clean_text(text):
+    """Collapse all whitespace (newlines and non-breaking spaces included) in one pass."""
+    return WHITESPACE_PATTERN.sub(" ", text).strip()
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _can_limit_pages():
+    """SIGALRM can only be set from the main thread, which is where pool workers run."""
+    return hasattr(signal, "setitimer") and threading.current_thread() is threading.main_thread()
+
+
+def _extract_page(page):
+    """Cleaned text of one PDF page, or "" if it fails or runs past PAGE_TIMEOUT."""
+    limit = _can_limit_pages()
+    if limit:
+        previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    try:
+        if limit:
+            signal.setitimer(signal.ITIMER_REAL, PAGE_TIMEOUT)
+        return clean_text((page.extract_text() or "")[:MAX_PAGE_CHARS])
+    except PageTimeout:
+        print(f"Skipped a PDF page that took over {PAGE_TIMEOUT:.0f}s")
+        return ""
+    except Exception as e:
+        print(f"Skipped a PDF page that could not be read: {e}")
+        return ""
+    finally:
+        if limit:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _extract_pages(data, page_numbers):
+    """Pool task: cleaned text of the given pages of a PDF."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [_extract_page(reader.pages[number]) for number in page_numbers]
+
+
+def get_extraction_pool(workers=EXTRACT_WORKERS):
+    """
+    Return the process-wide pool for page extraction, (re)starting it with the given size.
+
+    Workers are spawned rather than forked: the pool is started from Streamlit's
+    script threads, and forking a threaded process can copy held locks.
+    """
+    global _pool, _pool_workers
+
+    if _pool and _pool_workers == workers:
+        return _pool
+
+    with _pool_lock:
+        if not _pool or _pool_workers != workers:
+            if _pool:
+                _pool.shutdown(wait=False)
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _pool_workers = workers
+        return _pool
+
+
+def iter_pdf_pages(data, workers=None):
+    """
+    Yield the cleaned text of each page of a PDF, in page order, as it is extracted.
+
+    Long documents are split into page ranges extracted in the process pool; short
+    ones are extracted in this process. Off the main thread (e.g. in the Streamlit
+    app) PAGE_TIMEOUT cannot be enforced in this process, so every document goes
+    through the pool, whose workers do enforce it.
+
+    Args:
+        data: PDF file contents
+        workers: Process pool size, defaults to EXTRACT_WORKERS; 1 extracts in this
+                 process when called from the main thread
+    """
+    workers = workers or EXTRACT_WORKERS
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+
+    if _can_limit_pages() and (workers <= 1 or page_count < MIN_PARALLEL_PAGES):
+        for page in reader.pages:
+            yield _extract_page(page)
+        return
+
+    pool = get_extraction_pool(workers)
+    # A few ranges per worker, so the first pages are ready early
+    range_size = max(1, -(-page_count // (workers * 3)))
+    futures = [
+        pool.submit(_extract_pages, data, range(start, min(start + range_size, page_count)))
+        for start in range(0, page_count, range_size)
+    ]
+    try:
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def iter_resume_text(data, file_type, workers=None):
+    """
+    Yield cleaned text chunks of a resume: one per page for PDFs, the whole text for DOCX.
+
+    Args:
+        data: File contents
+        file_type: MIME type or extension of the file
+        workers: Process pool size for PDFs
+    """
+    if "pdf" in file_type:
+        yield from iter_pdf_pages(data, workers)
+    elif "docx" in file_type or "doc" in file_type:
+        yield clean_text(docx2txt.process(io.BytesIO(data)))
+    else:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+
+def extract_resume_text(data, file_type, workers=None):
+    """Cleaned text of a whole resume."""
+    return " ".join(chunk for chunk in iter_resume_text(data, file_type, workers) if chunk)
+
+
+BENCHMARK_WORDS = ("python sql project stakeholder analysis managed delivered customer data reporting "
+                   "team design developed testing cloud budget improved training safety compliance").split()
+
+
+def _pdf_string(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_synthetic_pdf(pages, lines_per_page=45, seed=0):
+    """Build a text PDF of the given number of resume-like pages, for benchmarks."""
+    rng = random.Random(seed)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for _ in range(pages):
+        lines = [" ".join(rng.choices(BENCHMARK_WORDS, k=12)) for _ in range(lines_per_page)]
+        stream = "BT /F1 10 Tf 14 TL 50 800 Td " + " ".join(f"({_pdf_string(line)}) '" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream".encode())
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents {len(objects)} 0 R "
+                       f"/Resources << /Font << /F1 3 0 R >> >> >>".encode())
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {pages} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def _extract_text_baseline(data):
+    """The previous extraction: sequential pages, string concatenation and three regex passes."""
+    text = ""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    for page_num in range(len(reader.pages)):
+        text += reader.pages[page_num].extract_text() + "\n"
+    text = re.sub(r'\n+', '\n', text)
+    text = re.sub(r'\s+', ' ', text)
+    text = text.replace('\xa0', ' ')
+    return text.strip()
+
+
+def run_benchmark(count, max_pages=50, workers=None):
+    """Time the baseline and the new extraction over synthetic resumes of 1 to max_pages pages."""
+    rng = random.Random(0)
+    corpus = [build_synthetic_pdf(rng.randint(1, max_pages), seed=i) for i in range(count)]
+    pages = sum(len(PyPDF2.PdfReader(io.BytesIO(data)).pages) for data in corpus)
+    print(f"Synthetic corpus: {count} resumes, {pages} pages, {sum(map(len, corpus)) / 2**20:.1f} MiB")
+
+    # Start the pool outside the timings
+    list(iter_pdf_pages(max(corpus, key=len), workers))
+
+    for label, extract in (("baseline", _extract_text_baseline),
+                           ("sequential", lambda data: extract_resume_text(data, "pdf", workers=1)),
+                           ("parallel", lambda data: extract_resume_text(data, "pdf", workers=workers))):
+        start = time.perf_counter()
+        texts = [extract(data) for data in corpus]
+        elapsed = time.perf_counter() - start
+        print(f"{label:>10}: {elapsed:.2f}s ({pages / elapsed:.0f} pages/s, "
+              f"{elapsed / count * 1000:.0f} ms per resume), {sum(map(len, texts))} characters")
+
+    start = time.perf_counter()
+    first_page = next(iter_pdf_pages(max(corpus, key=len), workers))
+    print(f"First page of the longest resume ready after {(time.perf_counter() - start) * 1000:.0f} ms "
+          f"({len(first_page)} characters)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the text of resume files.")
+    parser.add_argument("paths", nargs="*", help="PDF or DOCX files")
+    parser.add_argument("--workers", type=int, help="Process pool size")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Benchmark on N synthetic resumes of 1-50 pages instead")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark, workers=args.workers)
+        return
+
+    for path in args.paths:
+        with open(path, "rb") as f:
+            data = f.read()
+        start = time.perf_counter()
+        text = extract_resume_text(data, os.path.splitext(path)[1].lower(), workers=args.workers)
+        print(f"{path}: {len(text)} characters in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
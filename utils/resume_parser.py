@@ -1,9 +1,8 @@
 # utils/resume_parser.py
-import PyPDF2
-import docx2txt
-import re
 import streamlit as st
-
+from utils.resume_cache import get_resume_cache
+from utils.resume_extraction import extract_resume_text
+from utils.skill_extractor import get_skill_extractor
 
 
 def parse_resume(uploaded_file):
@@ -16,11 +15,9 @@ def parse_resume(uploaded_file):
     #     Returns:
     #         dict: Extracted information including skills
     #     """
-    #     # Extract text from file
-    resume_text = extract_text_from_resume(uploaded_file)
-
-    # Extract skills
-    skills = extract_skills_from_resume(resume_text)
+    #     # Extract text and skills from file
+    parsed = parse_resume_file(uploaded_file)
+    resume_text, skills = parsed["text"], parsed["skills"]
 
 
     if "resume_skills" not in st.session_state:
@@ -40,25 +37,30 @@ def parse_resume(uploaded_file):
     }
 
 
-def extract_text_from_resume(uploaded_file):
-    """Extract text from resume file"""
-    text = ""
+def parse_resume_file(uploaded_file):
+    """
+    Extract the text and skills of an uploaded resume, parsing each distinct file only once.
 
-    try:
-        file_type = uploaded_file.type
+    Args:
+        uploaded_file: File uploaded through Streamlit
+
+    Returns:
+        dict: {"text": str, "skills": list}
+    """
+    def parse():
+        text = extract_text_from_resume(uploaded_file)
+        # The extractor only finds vocabulary terms, so its names are already canonical
+        return {"text": text, "skills": extract_skills_from_resume(text)}
 
-        if "pdf" in file_type:
-            pdf_reader = PyPDF2.PdfReader(uploaded_file)
-            for page_num in range(len(pdf_reader.pages)):
-                text += pdf_reader.pages[page_num].extract_text() + "\n"
+    return get_resume_cache().get(uploaded_file.getvalue(), parse)
 
-        elif "docx" in file_type or "doc" in file_type:
-            text = docx2txt.process(uploaded_file)
 
-        else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+def extract_text_from_resume(uploaded_file):
+    """Extract text from resume file"""
+    text = ""
 
-        text = clean_text(text)
+    try:
+        text = extract_resume_text(uploaded_file.getvalue(), uploaded_file.type)
 
     except Exception as e:
         st.error(f"Error extracting text from resume: {str(e)}")
@@ -67,14 +69,14 @@ def extract_text_from_resume(uploaded_file):
 
 
 def extract_skills_from_resume(resume_text):
-    """Extract skills from resume text"""
-    ## Need to extract skills from the resume text here.
-    return None
+    """Extract the ASC skills, specialist tasks and technology tools mentioned in the resume text"""
+    if not resume_text:
+        return []
+
+    try:
+        return get_skill_extractor().skills(resume_text)
 
+    except Exception as e:
+        st.error(f"Error extracting skills from resume: {str(e)}")
+        return []
 
-def clean_text(text):
-    """Clean extracted text"""
-    text = re.sub(r'\n+', '\n', text)
-    text = re.sub(r'\s+', ' ', text)
-    text = text.replace('\xa0', ' ')
-    return text.strip()
\ No newline at end of file
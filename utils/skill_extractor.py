@@ -0,0 +1,190 @@
+# utils/skill_extractor.py
+import argparse
+import random
+import re
+import time
+from collections import deque
+
+from utils.asc_data import ASC_KB_JSON_PATH, KBSingleton, iter_asc_entries
+from utils.asc_index import TOKEN_PATTERN
+
+# Knowledge base fields whose entries are extracted, and the kind reported for them
+VOCABULARY_FIELDS = {"skills": "skill", "specialist_tasks": "specialist_task", "technology_tools": "technology_tool"}
+
+WORD_PATTERN = re.compile(TOKEN_PATTERN.pattern, re.IGNORECASE)
+
+
+def normalize_phrase(phrase):
+    """Lowercase word tokens of a phrase; case, punctuation and whitespace do not matter."""
+    return tuple(TOKEN_PATTERN.findall(phrase.lower()))
+
+
+class SkillExtractor:
+    """
+    Finds every mention of an ASC vocabulary term in a text in one pass.
+
+    The terms are compiled into an Aho-Corasick automaton over word tokens, so
+    matching is linear in the length of the text whatever the size of the
+    vocabulary, and mentions always start and end on word boundaries.
+    """
+
+    def __init__(self, goto, fail, outputs, terms):
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+        self.terms = terms
+
+    @classmethod
+    def from_terms(cls, terms):
+        """
+        Compile the automaton.
+
+        Args:
+            terms: Iterable of (canonical name, kind); later duplicates of a phrase are ignored
+        """
+        goto, outputs, unique = [{}], [()], []
+        seen = set()
+        for name, kind in terms:
+            tokens = normalize_phrase(name)
+            # Single letters ("C", "R") match far too much ordinary text
+            if not tokens or tokens in seen or (len(tokens) == 1 and len(tokens[0]) < 2):
+                continue
+            seen.add(tokens)
+
+            state = 0
+            for token in tokens:
+                next_state = goto[state].get(token)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][token] = next_state
+                    goto.append({})
+                    outputs.append(())
+                state = next_state
+            outputs[state] = ((len(unique), len(tokens)),)
+            unique.append({"name": name.strip(), "kind": kind})
+
+        # Breadth-first failure links; each state also reports the terms of its failure chain
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in goto[state].items():
+                queue.append(child)
+                fallback = fail[state]
+                while fallback and token not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = goto[fallback].get(token, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+
+        return cls(goto, fail, outputs, unique)
+
+    @classmethod
+    def build(cls, json_path=ASC_KB_JSON_PATH):
+        """Compile the skill, specialist task and technology tool vocabulary of the knowledge base."""
+        def terms():
+            for entry in iter_asc_entries(json_path):
+                metadata = entry.get("metadata", {})
+                for field, kind in VOCABULARY_FIELDS.items():
+                    for item in metadata.get(field, []):
+                        name = item.get("name", "") if isinstance(item, dict) else item
+                        if isinstance(name, str):
+                            yield name, kind
+
+        return cls.from_terms(terms())
+
+    def extract(self, text):
+        """
+        Find the vocabulary mentions in a text.
+
+        Overlapping mentions are resolved leftmost-longest, so "Microsoft Excel"
+        is reported once rather than also as "Excel".
+
+        Returns:
+            list: Dicts with the canonical name, kind, and start/end character offsets
+        """
+        words = [(match.group().lower(), match.start(), match.end()) for match in WORD_PATTERN.finditer(text)]
+        candidates = []
+        state = 0
+        for position, (token, _, _) in enumerate(words):
+            while state and token not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(token, 0)
+            for term, length in self.outputs[state]:
+                candidates.append((position - length + 1, -length, term))
+
+        mentions = []
+        covered = 0
+        for first, negative_length, term in sorted(candidates):
+            if first < covered:
+                continue
+            last = first - negative_length - 1
+            mentions.append(dict(self.terms[term], start=words[first][1], end=words[last][2]))
+            covered = last + 1
+        return mentions
+
+    def skills(self, text):
+        """Canonical names of the vocabulary terms mentioned in a text, in order of first mention."""
+        return list(dict.fromkeys(mention["name"] for mention in self.extract(text)))
+
+
+def _build_extractor(kb_version):
+    start = time.perf_counter()
+    extractor = SkillExtractor.build()
+    print(f"Skill extractor built with {len(extractor.terms)} terms in {time.perf_counter() - start:.2f}s")
+    return extractor
+
+
+_extractor = KBSingleton(_build_extractor)
+
+
+def get_skill_extractor():
+    """Return the process-wide SkillExtractor, rebuilding it when the knowledge base changes."""
+    return _extractor.get()
+
+
+def run_benchmark(term_count, resumes=200, words_per_resume=800):
+    """Time building an automaton of term_count synthetic terms and extracting from synthetic resumes."""
+    rng = random.Random(0)
+    words = [f"w{i}" for i in range(5000)] + ["python", "sql", "excel", "microsoft", "project", "management"]
+    terms = [(" ".join(rng.choices(words, k=rng.randint(1, 4))), "technology_tool") for _ in range(term_count)]
+    terms += [("Microsoft Excel", "technology_tool"), ("Excel", "technology_tool"), ("Project Management", "skill")]
+
+    start = time.perf_counter()
+    extractor = SkillExtractor.from_terms(terms)
+    print(f"Built {len(extractor.terms)} terms ({len(extractor.goto)} states) in {time.perf_counter() - start:.2f}s")
+
+    texts = [" ".join(rng.choices(words, k=words_per_resume)) + ", Microsoft  EXCEL and project-management."
+             for _ in range(resumes)]
+    start = time.perf_counter()
+    mentions = sum(len(extractor.extract(text)) for text in texts)
+    elapsed = time.perf_counter() - start
+    print(f"Extracted {mentions} mentions from {resumes} resumes of {words_per_resume} words: "
+          f"{elapsed / resumes * 1000:.2f} ms per resume")
+    print(f"Sample: {extractor.extract(texts[0])[-2:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract ASC skills, tasks and tools mentioned in a text file.")
+    parser.add_argument("path", nargs="?", help="Text file, e.g. an extracted resume")
+    parser.add_argument("--benchmark", type=int, metavar="N",
+                        help="Benchmark with N synthetic vocabulary terms instead")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        run_benchmark(args.benchmark)
+        return
+    if not args.path:
+        parser.error("a text file or --benchmark is required")
+
+    with open(args.path, "r", encoding="utf-8") as f:
+        text = f.read()
+    extractor = get_skill_extractor()
+    start = time.perf_counter()
+    mentions = extractor.extract(text)
+    print(f"{len(mentions)} mentions in {(time.perf_counter() - start) * 1000:.2f} ms")
+    for mention in mentions:
+        print(f"{mention['start']:>6}-{mention['end']:<6} {mention['kind']:<16} {mention['name']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# utils/skill_matcher.py
+import numpy as np
+from scipy import sparse
+
+from utils.asc_data import ASC_KB_JSON_PATH, KBSingleton, iter_asc_entries
+from utils.asc_index import tokenize
+from utils.tfidf import l2_normalize_rows, smoothed_idf
+
+
+class SkillMatcher:
+    """
+    Deterministic skill-to-occupation matching.
+
+    Each occupation is a TF-IDF vector over the terms of its specialist tasks and
+    technology tools. A user's skills form a sparse skill x term matrix, and one
+    sparse product scores every skill against every occupation at once, so each
+    match comes with the contribution of every skill.
+    """
+
+    def __init__(self, matrix, vocabulary, idf, occupations):
+        self.matrix = matrix
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.occupations = occupations
+
+    @classmethod
+    def build(cls, json_path=ASC_KB_JSON_PATH):
+        """Build the occupation x term matrix from the knowledge base JSON."""
+        vocabulary = {}
+        occupations = []
+        rows, cols, counts = [], [], []
+
+        for row, entry in enumerate(iter_asc_entries(json_path)):
+            metadata = entry.get("metadata", {})
+            occupations.append({
+                "anzsco_code": metadata.get("anzsco_code", "Unknown"),
+                "title": metadata.get("title", "Unknown Title"),
+            })
+
+            term_counts = {}
+            phrases = metadata.get("specialist_tasks", []) + metadata.get("technology_tools", [])
+            for token in tokenize(" ".join(phrases)):
+                term = vocabulary.setdefault(token, len(vocabulary))
+                term_counts[term] = term_counts.get(term, 0) + 1
+            rows.extend([row] * len(term_counts))
+            cols.extend(term_counts.keys())
+            counts.extend(term_counts.values())
+
+        tf = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float32), (rows, cols)),
+            shape=(len(occupations), len(vocabulary))
+        )
+        doc_freq = np.bincount(tf.indices, minlength=tf.shape[1])
+        idf = smoothed_idf(doc_freq, len(occupations))
+        return cls(l2_normalize_rows(tf.multiply(idf).tocsr()), vocabulary, idf, occupations)
+
+    def _skill_matrix(self, skills):
+        """Sparse skill x term matrix, each row an L2-normalised TF-IDF vector."""
+        rows, cols, values = [], [], []
+        for row, skill in enumerate(skills):
+            terms = list({self.vocabulary[token] for token in tokenize(skill) if token in self.vocabulary})
+            rows.extend([row] * len(terms))
+            cols.extend(terms)
+            values.extend(self.idf[terms])
+        return l2_normalize_rows(sparse.csr_matrix(
+            (np.array(values, dtype=np.float32), (rows, cols)),
+            shape=(len(skills), len(self.vocabulary))
+        ))
+
+    def match(self, skills, top_k=10):
+        """
+        Rank occupations against a list of skills.
+
+        Args:
+            skills: Skill names, e.g. from get_user_skills
+            top_k: Number of occupations to return
+
+        Returns:
+            list: Dicts with anzsco_code, title, score and contributions ({skill: score}), best first
+        """
+        skills = list(dict.fromkeys(skill for skill in skills if skill and skill.strip()))
+        if not skills or not self.occupations:
+            return []
+
+        # occupation x skill contributions from a single sparse product
+        contributions = (self.matrix @ self._skill_matrix(skills).T).toarray()
+        scores = contributions.sum(axis=1)
+
+        top_k = min(top_k, int(np.count_nonzero(scores)))
+        if top_k <= 0:
+            return []
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            dict(
+                self.occupations[i],
+                score=float(scores[i]),
+                contributions={
+                    skills[j]: float(contributions[i, j])
+                    for j in np.argsort(-contributions[i])
+                    if contributions[i, j] > 0
+                }
+            )
+            for i in top
+        ]
+
+
+_matcher = KBSingleton(lambda kb_version: SkillMatcher.build())
+
+
+def get_skill_matcher():
+    """Return the process-wide SkillMatcher, rebuilding it when the knowledge base changes."""
+    return _matcher.get()
+
+
+def format_skill_matches(matches):
+    """Format skill matches for an agent."""
+    if not matches:
+        return "No ASC occupations match the user's skills."
+    lines = ["Occupations ranked by skill match (score, then contributing skills):"]
+    for rank, match in enumerate(matches, start=1):
+        contributing = ", ".join(f"{skill} ({value:.2f})" for skill, value in match["contributions"].items())
+        lines.append(f"{rank}. {match['title']} (ANZSCO: {match['anzsco_code']}) - {match['score']:.2f}: {contributing}")
+    return "\n".join(lines)
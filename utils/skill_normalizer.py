@@ -0,0 +1,306 @@
+# utils/skill_normalizer.py
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from scipy import sparse
+
+from utils.asc_data import ASC_KB_JSON_PATH, KBSingleton, get_kb_version, iter_asc_entries
+from utils.asc_index import ASC_INDEX_DIR
+from utils.skill_extractor import normalize_phrase
+from utils.tfidf import l2_normalize_rows, smoothed_idf
+
+# Knowledge base fields holding canonical skill names
+CANONICAL_FIELDS = {"skills": "skill", "technology_tools": "technology_tool"}
+# Minimum cosine similarity for a skill to be mapped to a canonical ASC entry
+SKILL_MATCH_THRESHOLD = float(os.environ.get("SKILL_MATCH_THRESHOLD", 0.55))
+# Words that say nothing about which skill is meant ("project management skills")
+GENERIC_WORDS = {"skill", "skills", "experience", "knowledge", "proficiency", "programming"}
+# Abbreviations too short to share n-grams with the name they stand for
+ABBREVIATIONS = {"py": "python", "js": "javascript", "ts": "typescript", "ms": "microsoft",
+                 "k8s": "kubernetes", "ml": "machine learning", "ai": "artificial intelligence"}
+NGRAM_SIZE = 3
+
+def _ngrams(text):
+    """Character n-grams of the normalised text, padded so word starts and ends count."""
+    padded = f" {' '.join(normalize_phrase(text))} "
+    return [padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)] if padded.strip() else []
+
+
+def _clean(skill):
+    return " ".join(skill.split())
+
+
+def _query_text(skill):
+    """A skill as vectorised: abbreviations expanded and generic words dropped, unless nothing else is left."""
+    words = [ABBREVIATIONS.get(word, word) for word in normalize_phrase(skill)]
+    specific = [word for word in words if word not in GENERIC_WORDS]
+    return " ".join(specific or words)
+
+
+def _entry_texts(name):
+    """
+    Texts under which a canonical name is indexed: the name and any acronym that
+    spells the words before it ("Structured query language SQL" as "SQL").
+    """
+    words = name.split()
+    texts = [name]
+    for i, word in enumerate(words):
+        if len(word) > 1 and word.isalpha() and word.isupper() and i >= len(word):
+            initials = "".join(w[0] for w in words[i - len(word):i])
+            if initials.upper() == word:
+                texts.append(word)
+    return texts
+
+
+class SkillNormalizer:
+    """
+    Maps free-text skills ("Python 3", "excel", "customer services") to canonical ASC entries.
+
+    Canonical skills and technology tools are L2-normalised TF-IDF vectors over
+    character trigrams, held in a sparse entry x n-gram matrix. A batch of inputs is
+    vectorised into one sparse matrix and scored against every entry with a single
+    sparse product; the best entry per input is its top-1 cosine match. Names with
+    an acronym also have a row for it, and a few common abbreviations are expanded
+    in the inputs, since trigrams cannot tie "aws" or "py" to the full name.
+
+    Input n-grams that no entry has still count towards the input's norm, so extra
+    words lower the score: "Python programming" is not an exact match for "Python".
+    The default threshold separates correct mappings from near misses such as
+    TypeScript and JavaScript or Google Ads and Google Analytics.
+    """
+
+    def __init__(self, matrix, features, idf, entries, threshold=SKILL_MATCH_THRESHOLD, kb_version=None):
+        self.matrix = matrix
+        self.features = features
+        self.idf = idf
+        self.entries = entries
+        self.threshold = threshold
+        self.kb_version = kb_version
+
+    @classmethod
+    def build(cls, json_path=ASC_KB_JSON_PATH):
+        """Build the entry x n-gram matrix from the knowledge base JSON."""
+        entries, seen = [], set()
+        for entry in iter_asc_entries(json_path):
+            metadata = entry.get("metadata", {})
+            for field, kind in CANONICAL_FIELDS.items():
+                for item in metadata.get(field, []):
+                    name = item.get("name", "") if isinstance(item, dict) else item
+                    key = normalize_phrase(name) if isinstance(name, str) else None
+                    if key and key not in seen:
+                        seen.add(key)
+                        entries.extend({"name": _clean(name), "kind": kind, "text": text}
+                                       for text in _entry_texts(_clean(name)))
+        normalizer = cls.from_entries(entries)
+        normalizer.kb_version = get_kb_version(json_path)
+        return normalizer
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Build from a list of {"name", "kind"} dicts, with an optional "text" indexed
+        in place of the name. A name can appear under several texts.
+        """
+        texts = [entry.get("text", entry["name"]) for entry in entries]
+        features = {}
+        for text in texts:
+            for gram in _ngrams(text):
+                features.setdefault(gram, len(features))
+
+        tf, _ = cls._count_matrix(texts, features)
+        doc_freq = np.bincount(tf.indices, minlength=len(features))
+        idf = smoothed_idf(doc_freq, len(entries))
+        return cls(cls._weigh(tf, idf), features, idf, entries)
+
+    @staticmethod
+    def _count_matrix(texts, features):
+        """
+        N-gram counts of texts over the known features.
+
+        Returns:
+            tuple: (sparse text x feature count matrix, per text the sublinear TF of
+                    each n-gram that is not a feature)
+        """
+        rows, cols, counts, unknown = [], [], [], []
+        for row, text in enumerate(texts):
+            grams, missing = {}, {}
+            for gram in _ngrams(text):
+                column = features.get(gram)
+                if column is not None:
+                    grams[column] = grams.get(column, 0) + 1
+                else:
+                    missing[gram] = missing.get(gram, 0) + 1
+            rows.extend([row] * len(grams))
+            cols.extend(grams.keys())
+            counts.extend(grams.values())
+            unknown.append([1 + np.log(count) for count in missing.values()])
+        tf = sparse.csr_matrix(
+            (np.array(counts, dtype=np.float32), (rows, cols)),
+            shape=(len(texts), len(features))
+        )
+        return tf, unknown
+
+    @staticmethod
+    def _weigh(tf, idf, extra_norms=None):
+        """
+        Sublinear TF-IDF, rows L2-normalised.
+
+        Args:
+            extra_norms: Squared weight per row that is not in the matrix, e.g. of
+                         query n-grams no entry has; it counts towards the norm only
+        """
+        tf = tf.copy()
+        tf.data = 1 + np.log(tf.data)
+        matrix = tf.multiply(idf).tocsr()
+        return l2_normalize_rows(matrix, extra_norms)
+
+    def save(self, index_dir=ASC_INDEX_DIR):
+        os.makedirs(index_dir, exist_ok=True)
+        sparse.save_npz(os.path.join(index_dir, "skill_normalizer.npz"), self.matrix)
+        with open(os.path.join(index_dir, "skill_normalizer.json"), "w") as f:
+            json.dump({"features": self.features, "idf": self.idf.tolist(), "entries": self.entries,
+                       "kb_version": self.kb_version}, f)
+
+    @classmethod
+    def load(cls, index_dir=ASC_INDEX_DIR):
+        matrix = sparse.load_npz(os.path.join(index_dir, "skill_normalizer.npz")).tocsr()
+        with open(os.path.join(index_dir, "skill_normalizer.json"), "r") as f:
+            data = json.load(f)
+        return cls(matrix, data["features"], np.array(data["idf"], dtype=np.float32), data["entries"],
+                   kb_version=data.get("kb_version"))
+
+    def normalize(self, skills):
+        """
+        Map skills to their closest canonical ASC entries.
+
+        Args:
+            skills: List of free-text skills
+
+        Returns:
+            list: Per input, a dict with the input, the canonical name and kind (None
+                  when no entry matches) and the cosine score
+        """
+        if not skills:
+            return []
+        if not self.entries:
+            return [{"input": skill, "name": None, "kind": None, "score": 0.0} for skill in skills]
+
+        tf, unknown = self._count_matrix([_query_text(skill) for skill in skills], self.features)
+        # An n-gram no entry has weighs as much as the rarest known one; leaving it out
+        # of the norm would score "Python programming" as an exact match for "Python"
+        unknown_idf = smoothed_idf(0, len(self.entries))
+        extra_norms = np.array([sum(w * w for w in weights) for weights in unknown], dtype=np.float32) * unknown_idf ** 2
+        queries = self._weigh(tf, self.idf, extra_norms)
+        scores = (queries @ self.matrix.T).tocsr()
+        best = np.asarray(scores.argmax(axis=1)).ravel()
+        best_scores = scores.max(axis=1).toarray().ravel()
+
+        results = []
+        for skill, entry, score in zip(skills, best, best_scores):
+            matched = score >= self.threshold
+            results.append({
+                "input": skill,
+                "name": self.entries[entry]["name"] if matched else None,
+                "kind": self.entries[entry]["kind"] if matched else None,
+                "score": float(score),
+            })
+        return results
+
+    def canonical_map(self, skills):
+        """{cleaned skill: canonical ASC name, or None} for the skills, without duplicates."""
+        cleaned = dedupe_skills(_clean(skill) for skill in skills)
+        return {result["input"]: result["name"] for result in self.normalize(cleaned)}
+
+
+def dedupe_skills(names):
+    """Non-empty names without case-insensitive duplicates, first spelling and order kept."""
+    unique = {}
+    for name in names:
+        if name:
+            unique.setdefault(name.lower(), name)
+    return list(unique.values())
+
+
+def _load_normalizer(kb_version):
+    normalizer = None
+    if os.path.exists(os.path.join(ASC_INDEX_DIR, "skill_normalizer.npz")):
+        normalizer = SkillNormalizer.load()
+        if kb_version != "none" and normalizer.kb_version != kb_version:
+            print("Prebuilt skill normalizer is out of date. Rebuilding from the knowledge base...")
+            normalizer = None
+    else:
+        print("No prebuilt skill normalizer found. Building from the knowledge base...")
+    if not normalizer:
+        normalizer = SkillNormalizer.build()
+        normalizer.save()
+    return normalizer
+
+
+_normalizer = KBSingleton(_load_normalizer)
+
+
+def get_skill_normalizer():
+    """
+    Return the process-wide SkillNormalizer, loading it from disk on first use.
+
+    If no prebuilt index exists, or it was built from a different version of the
+    knowledge base JSON, it is rebuilt and saved.
+    """
+    return _normalizer.get()
+
+
+def canonicalize_skills(skills):
+    """
+    Map free-text skills to canonical ASC names, in one batch.
+
+    The inputs are kept as the user wrote them (cleaned); the canonical name is
+    stored beside each. Skills with no match, or every skill if the normalizer
+    cannot be loaded, map to None, so adding skills never fails because the
+    knowledge base is missing.
+
+    Returns:
+        dict: {cleaned skill: canonical name or None}
+    """
+    try:
+        return get_skill_normalizer().canonical_map(skills)
+    except Exception as e:
+        print(f"Skill normalization unavailable: {e}")
+        return {skill: None for skill in dedupe_skills(_clean(skill) for skill in skills)}
+
+
+def canonical_names(skills):
+    """
+    The skills as canonical ASC names, without duplicates; skills with no match
+    keep their (cleaned) wording. Canonical names map to themselves.
+    """
+    return dedupe_skills(name or skill for skill, name in canonicalize_skills(skills).items())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the skill normalizer index or normalize skills with it.")
+    parser.add_argument("skills", nargs="*", help="Skills to normalize (builds the index if omitted)")
+    parser.add_argument("--json-path", default=ASC_KB_JSON_PATH, help="Knowledge base JSON")
+    args = parser.parse_args()
+
+    if not args.skills:
+        start = time.perf_counter()
+        normalizer = SkillNormalizer.build(args.json_path)
+        normalizer.save()
+        print(f"Indexed {len(normalizer.entries)} canonical skills, {len(normalizer.features)} n-grams "
+              f"in {time.perf_counter() - start:.2f}s")
+        return
+
+    normalizer = get_skill_normalizer()
+    start = time.perf_counter()
+    results = normalizer.normalize(args.skills)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    for result in results:
+        print(f"{result['score']:5.2f}  {result['input']!r} -> {result['name']!r}")
+    print(f"{len(results)} skills in {elapsed_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
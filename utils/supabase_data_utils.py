@@ -1,4 +1,16 @@
+import asyncio
 import streamlit as st
+from utils.profile_cache import get_profile_cache
+from utils.skill_normalizer import canonical_names, canonicalize_skills
+
+# Set to False once the get_user_profile_data RPC is found to be missing
+_profile_rpc_available = True
+# Set to False once user_skills is found to have no canonical_skill column
+_canonical_skill_column_available = True
+# PostgREST and Postgres codes for a function that does not exist
+MISSING_FUNCTION_CODES = ("PGRST202", "42883")
+# PostgREST and Postgres codes for a column that does not exist
+MISSING_COLUMN_CODES = ("PGRST204", "42703")
 
 def get_user_profile(supabase, user):
     try:
@@ -8,28 +20,82 @@ def get_user_profile(supabase, user):
         st.error(f"Error fetching profile: {e}")
         return None
 
+def _query_user_skills(supabase, user):
+    """
+    A user's skills as canonical ASC names, from the canonical_skill column where
+    it is set. Skills saved before the column existed are normalised here.
+    """
+    global _canonical_skill_column_available
+
+    if _canonical_skill_column_available:
+        try:
+            response = supabase.table('user_skills').select('skill, canonical_skill').eq('user_id', user.id).execute()
+        except Exception as e:
+            if not _is_missing_column(e, "canonical_skill"):
+                raise
+            print(f"user_skills has no canonical_skill column, reading the skills alone: {e}")
+            _canonical_skill_column_available = False
+    if not _canonical_skill_column_available:
+        response = supabase.table('user_skills').select('skill').eq('user_id', user.id).execute()
+    rows = response.data or []
+    return canonical_names([item.get('canonical_skill') or item['skill'] for item in rows]) if rows else []
+
 def get_user_skills(supabase, user):
     try:
-        response = supabase.table('user_skills').select('skill').eq('user_id', user.id).execute()
-        return [item['skill'] for item in response.data] if response.data else []
+        return _query_user_skills(supabase, user)
     except Exception as e:
         st.error(f"Error fetching skills: {e}")
         return []
 
 def add_user_skill(supabase, user, skill):
+    """Save one skill, see add_user_skills."""
+    return add_user_skills(supabase, user, [skill])
+
+def add_user_skills(supabase, user, skills):
+    """
+    Save skills as the user wrote them, each with its canonical ASC name beside it.
+
+    The canonical name goes in the canonical_skill column of user_skills:
+
+        alter table user_skills add column canonical_skill text;
+
+    Until that column exists the skills are saved without it.
+    """
+    global _canonical_skill_column_available
+
     try:
+        canonical = canonicalize_skills(skills)
+        if not canonical:
+            return False
+        rows = [{"user_id": user.id, "skill": skill} for skill in canonical]
+        if _canonical_skill_column_available:
+            for row in rows:
+                row["canonical_skill"] = canonical[row["skill"]]
         # Use upsert=True if you want to ignore duplicates based on UNIQUE constraint
-        response = supabase.table('user_skills').insert({"user_id": user.id, "skill": skill}, upsert=True).execute()
+        try:
+            response = supabase.table('user_skills').insert(rows, upsert=True).execute()
+        except Exception as e:
+            if "canonical_skill" not in rows[0] or not _is_missing_column(e, "canonical_skill"):
+                raise
+            print(f"user_skills has no canonical_skill column, saving the skills alone: {e}")
+            _canonical_skill_column_available = False
+            for row in rows:
+                del row["canonical_skill"]
+            response = supabase.table('user_skills').insert(rows, upsert=True).execute()
+        get_profile_cache().invalidate(user.id)
         # Check response.data to see if insert happened or was ignored
         return len(response.data) > 0 # True if inserted/updated
     except Exception as e:
-        st.error(f"Error adding skill: {e}")
+        st.error(f"Error adding skills: {e}")
         return False
 
+def _query_user_competencies(supabase, user):
+    response = supabase.table('user_competencies').select('competency_name, rating').eq('user_id', user.id).execute()
+    return {item['competency_name']: item['rating'] for item in response.data} if response.data else {}
+
 def get_user_competencies(supabase, user):
     try:
-        response = supabase.table('user_competencies').select('competency_name, rating').eq('user_id', user.id).execute()
-        return {item['competency_name']: item['rating'] for item in response.data} if response.data else {}
+        return _query_user_competencies(supabase, user)
     except Exception as e:
         st.error(f"Error fetching competencies: {e}")
         return {}
@@ -43,7 +109,101 @@ def save_user_competencies(supabase, user, ratings_dict):
         if not data_to_upsert:
             return True # Nothing to save
         response = supabase.table('user_competencies').upsert(data_to_upsert).execute()
+        get_profile_cache().invalidate(user.id)
         return True
     except Exception as e:
         st.error(f"Error saving competencies: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def get_user_profile_data(supabase, user):
+    """
+    Fetch a user's skills and competencies in a single round trip.
+
+    Uses the get_user_profile_data RPC:
+
+        create function get_user_profile_data(p_user_id uuid) returns json
+        language sql stable as $$
+            select json_build_object(
+                'skills', coalesce((select json_agg(coalesce(canonical_skill, skill))
+                                    from user_skills where user_id = p_user_id), '[]'),
+                'competencies', coalesce((select json_object_agg(competency_name, rating)
+                                          from user_competencies where user_id = p_user_id), '{}')
+            )
+        $$;
+
+    Skills are returned as canonical ASC names (see _query_user_skills). Falls back
+    to the two table queries if the RPC is not installed or fails. Query
+    errors are raised rather than returned as an empty profile, so the profile
+    cache never stores one.
+
+    Returns:
+        dict: {"skills": list, "competencies": dict}
+    """
+    profile = _fetch_profile_rpc(supabase, user)
+    if profile is not None:
+        return profile
+
+    return {
+        "skills": _query_user_skills(supabase, user),
+        "competencies": _query_user_competencies(supabase, user)
+    }
+
+def _is_missing_function(error):
+    """Whether a Supabase error says the called function does not exist."""
+    code = str(getattr(error, "code", "") or "")
+    return code in MISSING_FUNCTION_CODES or "could not find the function" in str(error).lower()
+
+def _is_missing_column(error, column):
+    """Whether a Supabase error says the given column does not exist."""
+    code = str(getattr(error, "code", "") or "")
+    return column in str(error) and (code in MISSING_COLUMN_CODES or "column" in str(error).lower())
+
+def _fetch_profile_rpc(supabase, user):
+    """Fetch the profile with the get_user_profile_data RPC, or None if it is not installed or fails."""
+    global _profile_rpc_available
+
+    if not _profile_rpc_available:
+        return None
+    try:
+        response = supabase.rpc('get_user_profile_data', {"p_user_id": user.id}).execute()
+        data = response.data or {}
+        # Canonical names map to themselves, so this only normalises skills saved without one
+        skills = canonical_names(data.get("skills") or [])
+        return {"skills": skills, "competencies": data.get("competencies") or {}}
+    except Exception as e:
+        if _is_missing_function(e):
+            print(f"get_user_profile_data RPC not installed, using separate queries: {e}")
+            _profile_rpc_available = False
+        else:
+            print(f"get_user_profile_data RPC failed, using separate queries: {e}")
+        return None
+
+def get_cached_user_profile_data(supabase, user):
+    """Return a user's skills and competencies through the process-wide profile cache."""
+    return get_profile_cache().get(user.id, lambda: get_user_profile_data(supabase, user))
+
+# Async variants for use inside agent runs. The Supabase client is synchronous, so
+# each call is offloaded to a worker thread and the event loop stays free for other
+# sessions' runs.
+
+async def aget_user_skills(supabase, user):
+    return await asyncio.to_thread(_query_user_skills, supabase, user)
+
+async def aget_user_competencies(supabase, user):
+    return await asyncio.to_thread(_query_user_competencies, supabase, user)
+
+async def aget_user_profile_data(supabase, user):
+    """Async get_user_profile_data; without the RPC, skills and competencies are fetched concurrently."""
+    profile = await asyncio.to_thread(_fetch_profile_rpc, supabase, user)
+    if profile is not None:
+        return profile
+
+    skills, competencies = await asyncio.gather(
+        aget_user_skills(supabase, user),
+        aget_user_competencies(supabase, user)
+    )
+    return {"skills": skills, "competencies": competencies}
+
+async def aget_cached_user_profile_data(supabase, user):
+    """Async get_cached_user_profile_data."""
+    return await get_profile_cache().aget(user.id, lambda: aget_user_profile_data(supabase, user))
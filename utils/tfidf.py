@@ -0,0 +1,28 @@
+# utils/tfidf.py
+import numpy as np
+from scipy import sparse
+
+
+def smoothed_idf(doc_freq, n_docs):
+    """Smoothed inverse document frequency, log((1 + n) / (1 + df)) + 1, as float32."""
+    return (np.log((1 + n_docs) / (1 + doc_freq)) + 1).astype(np.float32)
+
+
+def l2_normalize_rows(matrix, extra_norms=None):
+    """
+    Divide each row of a sparse matrix by its L2 norm. Empty rows stay empty.
+
+    Args:
+        matrix: Sparse matrix
+        extra_norms: Optional squared weight per row that is not in the matrix but
+                     counts towards its norm
+
+    Returns:
+        csr_matrix: The normalised float32 matrix
+    """
+    squared = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    if extra_norms is not None:
+        squared = squared + extra_norms
+    row_norms = np.sqrt(squared)
+    row_norms[row_norms == 0] = 1
+    return sparse.diags(1 / row_norms).dot(matrix).tocsr().astype(np.float32)